@@ -4,9 +4,37 @@ Data cleaning and transformation module.
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Union
+import functools
 import logging
+from scipy.spatial import cKDTree
 from config import settings
 
+# String values recognised as booleans by _convert_data_types
+BOOLEAN_STRINGS = {'true': True, 'false': False, 'True': True, 'False': False}
+
+def _to_numeric_or_keep(column: pd.Series) -> pd.Series:
+    """Convert a column to numeric, leaving it unchanged if any value is not numeric."""
+    try:
+        return pd.to_numeric(column)
+    except (ValueError, TypeError) as e:
+        logging.debug(f"Could not convert column {column.name}: {str(e)}")
+        return column
+
+@functools.lru_cache(maxsize=4)
+def _zoning_tree(coords_bytes: bytes, n_rows: int) -> cKDTree:
+    """
+    Build (or reuse) a KDTree over zoning coordinates.
+    
+    Args:
+        coords_bytes (bytes): Raw float64 (latitude, longitude) pairs, used as the cache key
+        n_rows (int): Number of coordinate pairs
+        
+    Returns:
+        cKDTree: Tree over the zoning coordinates
+    """
+    coords = np.frombuffer(coords_bytes, dtype=np.float64).reshape(n_rows, 2)
+    return cKDTree(coords)
+
 class DataCleaner:
     """
     Class for cleaning and transforming data from various sources.
@@ -77,17 +105,14 @@ class DataCleaner:
         Returns:
             pd.DataFrame: Cleaned DataFrame
         """
-        # Make a copy to avoid modifying the original
-        df = df.copy()
-        
-        # Remove duplicates
+        # Remove duplicates (returns a new frame, so the original is never modified)
         df = df.drop_duplicates()
         
         # Handle missing values
         df = self._handle_missing_values(df)
         
         # Standardize column names
-        df.columns = [col.lower().replace(' ', '_') for col in df.columns]
+        df = df.rename(columns={col: col.lower().replace(' ', '_') for col in df.columns})
         
         # Convert data types
         df = self._convert_data_types(df)
@@ -105,21 +130,20 @@ class DataCleaner:
             pd.DataFrame: DataFrame with handled missing values
         """
         # Calculate completeness ratio for each row
-        completeness = df.notna().mean(axis=1)
+        completeness = df.notna().to_numpy().mean(axis=1)
         
         # Filter rows based on completeness threshold
         df = df[completeness >= self.clean_threshold]
         
-        # Fill remaining missing values based on data type
-        for column in df.columns:
-            if df[column].dtype == 'object':
-                df[column] = df[column].fillna('unknown')
-            elif pd.api.types.is_numeric_dtype(df[column]):
-                df[column] = df[column].fillna(df[column].median())
-            elif pd.api.types.is_datetime64_dtype(df[column]):
-                df[column] = df[column].fillna(pd.NaT)
+        # Fill remaining missing values based on data type in a single pass:
+        # medians for numeric columns, 'unknown' for object columns
+        # (datetime columns are left as NaT)
+        numeric_columns = df.select_dtypes(include='number').columns
+        object_columns = df.select_dtypes(include='object').columns
+        fill_values = df[numeric_columns].median().to_dict()
+        fill_values.update(dict.fromkeys(object_columns, 'unknown'))
         
-        return df
+        return df.fillna(fill_values)
     
     def _convert_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -131,21 +155,17 @@ class DataCleaner:
         Returns:
             pd.DataFrame: DataFrame with converted data types
         """
-        # Identify and convert numeric columns
-        for column in df.columns:
-            try:
-                # Try to convert to numeric
-                if df[column].dtype == 'object':
-                    df[column] = pd.to_numeric(df[column], errors='ignore')
-                    
-                # Convert boolean-like columns
-                if df[column].dtype == 'object':
-                    if df[column].isin(['true', 'false', 'True', 'False']).all():
-                        df[column] = df[column].map({'true': True, 'false': False,
-                                                   'True': True, 'False': False})
-            except Exception as e:
-                logging.debug(f"Could not convert column {column}: {str(e)}")
-                continue
+        # Identify and convert numeric columns in one pass over the object columns
+        object_columns = df.select_dtypes(include='object').columns
+        if len(object_columns):
+            df[object_columns] = df[object_columns].apply(_to_numeric_or_keep)
+        
+        # Convert boolean-like columns (every value a true/false string)
+        object_columns = df.select_dtypes(include='object').columns
+        is_bool_like = df[object_columns].isin(list(BOOLEAN_STRINGS)).all()
+        bool_columns = is_bool_like.index[is_bool_like]
+        if len(bool_columns):
+            df[bool_columns] = df[bool_columns].apply(lambda col: col.map(BOOLEAN_STRINGS))
                 
         return df
     
@@ -168,15 +188,22 @@ class DataCleaner:
         if 'latitude' not in permits_df.columns:
             permits_df = self._geocode_addresses(permits_df)
             
-        # Merge based on nearest coordinates
-        merged_df = pd.merge_asof(
-            permits_df.sort_values('latitude'),
-            zoning_df.sort_values('latitude'),
-            on='latitude',
-            by='longitude',
-            tolerance=0.001  # ~100m tolerance
+        # Match each permit to its nearest zoning record
+        zoning_coords = np.ascontiguousarray(zoning_df[['latitude', 'longitude']].to_numpy(dtype=np.float64))
+        tree = _zoning_tree(zoning_coords.tobytes(), len(zoning_coords))
+        _, idx = tree.query(
+            permits_df[['latitude', 'longitude']].to_numpy(),
+            k=1,
+            distance_upper_bound=0.001  # ~100m tolerance
         )
         
+        # Unmatched permits get index len(zoning_df); map them to a missing row
+        idx = np.where(idx < len(zoning_df), idx, -1)
+        zoning_matches = zoning_df.drop(columns=['latitude', 'longitude']).reset_index(drop=True)
+        zoning_matches = zoning_matches.reindex(idx).reset_index(drop=True)
+        
+        merged_df = permits_df.reset_index(drop=True).join(zoning_matches, rsuffix='_zoning')
+        
         return merged_df
     
     def _geocode_addresses(self, df: pd.DataFrame) -> pd.DataFrame:
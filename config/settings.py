@@ -15,24 +15,35 @@ API_KEYS = {
 DATA_SOURCES = {
     'yelp': {
         'base_url': 'https://api.yelp.com/v3/transactions/delivery/search',
-        'limit': 50
+        'limit': 50,  # Results per page
+        'max_results': 240,  # Yelp caps offset + limit at 240 per search
+        'max_concurrent_requests': 5,  # Requests in flight at once
+        'requests_per_second': 5  # Sustained request rate, spaced evenly
     },
     'opentable': {
         'base_url': 'https://www.opentable.com',
         'search_path': '/s',
-        'max_pages': 1
+        'max_pages': 1,
+        'max_concurrent_requests': 20,  # Pages scraped at once
+        'requests_per_second': 10  # Sustained request rate, spaced evenly
     },
     'csv': {
-        'zoning_file': 'data/raw/la_zoning_1.csv'
+        'zoning_file': 'data/raw/la_zoning_1.csv',
+        'zcta_file': 'data/raw/zcta/tl_2020_us_zcta520.shp',  # Census ZIP code tabulation areas
+        'zcta_column': 'ZCTA5CE20'
     }
 }
 
 # Data processing settings
 PROCESSING = {
     'clean_threshold': 0.8,  # Minimum data completeness threshold
-    'output_format': 'csv',  # Changed to CSV for semi-processed data
+    'output_format': 'parquet',  # Semi-processed snapshots keep their dtypes and nested columns
     'chunk_size': 1000,
-    'delay_between_requests': 5  # Delay in seconds between API requests
+    'delay_between_requests': 5,  # Delay in seconds between API requests
+    'max_retries': 3,  # Retries for failed or throttled HTTP requests
+    'retry_backoff_factor': 0.5,  # Base retry delay in seconds, doubled per attempt (capped at 30s)
+    'use_cache': True,  # Reuse today's fetched results per cluster instead of re-requesting
+    'cache_dir': 'data/cache'
 }
 
 # Location settings - List of coordinates to process
@@ -1,37 +1,59 @@
 import pandas as pd
+import ast
+import hashlib
+import json
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
+import pyarrow.parquet as pq
+from config import settings
 
 logger = logging.getLogger(__name__)
 
-def process_restaurant_data() -> pd.DataFrame:
+# Processed snapshots keyed by input file, reused when the input is unchanged.
+# The cache is local to this checkout: never share it or populate it from outside
+PROCESSED_CACHE_DIR = Path('data/processed/_cache')
+
+# Part of the processed-cache key; bump whenever the processing functions'
+# output changes so cached results from older code are not reused
+PROCESSING_VERSION = 1
+
+# Narrow dtypes for the processed numeric columns (coordinates keep ~1m precision)
+PROCESSED_DTYPES = {
+    'lat': 'float32',
+    'long': 'float32',
+    'rating': 'float32',
+    'review_count': 'Int32',  # nullable: OpenTable may omit review counts
+    'price_category': 'int8'
+}
+
+def process_restaurant_data(raw_data: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
     """
     Process and combine restaurant data from Yelp and OpenTable.
     
+    Args:
+        raw_data (Dict[str, pd.DataFrame], optional): Freshly loaded data keyed by source
+            name ('Yelp', 'OpenTable'). Sources missing from it are read from their latest
+            semi-processed snapshot
+    
     Returns:
         pd.DataFrame: Combined and processed restaurant data
     """
     try:
-        # Load Yelp data
-        yelp_file = list(Path('data/semi_processed').glob('yelp_data_*.csv'))[-1]
-        yelp_df = pd.read_csv(yelp_file)
-        
-        # Load OpenTable data
-        opentable_file = list(Path('data/semi_processed').glob('opentable_data_*.csv'))[-1]
-        opentable_df = pd.read_csv(opentable_file)
+        raw_data = raw_data or {}
         
         # Process Yelp data
-        yelp_processed = _process_yelp_data(yelp_df)
+        yelp_processed = _process_source(raw_data.get('Yelp'), 'yelp_data', _process_yelp_data)
         
         # Process OpenTable data
-        opentable_processed = _process_opentable_data(opentable_df)
+        opentable_processed = _process_source(raw_data.get('OpenTable'), 'opentable_data', _process_opentable_data)
         
         # Combine datasets
         combined_df = pd.concat([yelp_processed, opentable_processed], ignore_index=True)
         
-        # Drop duplicates based on name, lat, and long
-        combined_df = combined_df.drop_duplicates(subset=['name', 'lat', 'long'])
+        # Drop duplicates based on name, lat, and long via a single 64-bit row hash
+        dedup_key = pd.util.hash_pandas_object(combined_df[['name', 'lat', 'long']], index=False)
+        combined_df = combined_df[~dedup_key.duplicated().to_numpy()]
         
         # Save processed data
         output_dir = Path('data/processed')
@@ -46,17 +68,123 @@ def process_restaurant_data() -> pd.DataFrame:
         logger.error(f"Error processing restaurant data: {str(e)}")
         raise
 
+def _process_source(df: Optional[pd.DataFrame], prefix: str,
+                    process_fn: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Process a source's in-memory data, or its latest snapshot if none was loaded.
+    
+    Args:
+        df (pd.DataFrame, optional): Data loaded in this run
+        prefix (str): Snapshot file prefix to fall back to (e.g. 'yelp_data')
+        process_fn (Callable[[pd.DataFrame], pd.DataFrame]): Source-specific processing function
+        
+    Returns:
+        pd.DataFrame: Processed data
+    """
+    if df is not None:
+        return process_fn(df)
+    return _process_cached(_latest_snapshot(prefix), process_fn)
+
+def _latest_snapshot(prefix: str) -> Path:
+    """
+    Find the semi-processed snapshot for a source, preferring Parquet over legacy CSV.
+    
+    Args:
+        prefix (str): Snapshot file prefix (e.g. 'yelp_data')
+        
+    Returns:
+        Path: Snapshot file to read
+    """
+    semi_processed_dir = Path('data/semi_processed')
+    for extension in ('parquet', 'csv'):
+        files = list(semi_processed_dir.glob(f'{prefix}_*.{extension}'))
+        if files:
+            # glob order is arbitrary; names end in a %Y%m%d_%H%M%S
+            # timestamp, so the newest snapshot has the largest name
+            return max(files, key=lambda p: p.name)
+    raise FileNotFoundError(f"No semi-processed snapshot found for {prefix}")
+
+def _process_cached(file_path: Path, process_fn: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Process a snapshot, reusing the result of a previous run if the file is unchanged.
+    
+    Args:
+        file_path (Path): Snapshot to process
+        process_fn (Callable[[pd.DataFrame], pd.DataFrame]): Source-specific processing function
+        
+    Returns:
+        pd.DataFrame: Processed data
+    """
+    # Key the cache on the snapshot's identity, modification time and size,
+    # and on the processing code version
+    stat = file_path.stat()
+    cache_key = hashlib.sha1(
+        f"{file_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{process_fn.__name__}|{PROCESSING_VERSION}".encode()
+    ).hexdigest()[:16]
+    cache_file = PROCESSED_CACHE_DIR / f"{file_path.stem}_{cache_key}.parquet"
+    
+    if cache_file.exists():
+        logger.info(f"Using cached processed data from {cache_file}")
+        cached = pd.read_parquet(cache_file, engine='pyarrow')
+        # Parquet list columns come back as arrays; restore the lists the processors produce
+        cached['categories'] = cached['categories'].map(list)
+        return cached
+    
+    processed = _process_in_batches(file_path, process_fn)
+    PROCESSED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # Entries for this snapshot under any other key are stale; remove them,
+    # including pickles left by older versions of the cache
+    for suffix in ('parquet', 'pkl'):
+        for stale_file in PROCESSED_CACHE_DIR.glob(f"{file_path.stem}_{'?' * len(cache_key)}.{suffix}"):
+            stale_file.unlink(missing_ok=True)
+    
+    processed.to_parquet(cache_file, index=False, engine='pyarrow')
+    return processed
+
+def _process_in_batches(file_path: Path, process_fn: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Stream a semi-processed snapshot in batches and process each batch.
+    
+    Args:
+        file_path (Path): Parquet (or legacy CSV) snapshot to read
+        process_fn (Callable[[pd.DataFrame], pd.DataFrame]): Source-specific processing function
+        
+    Returns:
+        pd.DataFrame: Processed data from all batches
+    """
+    chunk_size = settings.PROCESSING['chunk_size']
+    if file_path.suffix == '.csv':
+        chunks = pd.read_csv(file_path, chunksize=chunk_size)
+    else:
+        parquet_file = pq.ParquetFile(file_path)
+        chunks = (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunk_size))
+    return pd.concat([process_fn(chunk) for chunk in chunks], ignore_index=True)
+
 def _process_yelp_data(df: pd.DataFrame) -> pd.DataFrame:
     """Process Yelp data to match required format."""
     processed = df.copy()
     
     # Convert categories to list if it's a string
     if isinstance(processed['categories'].iloc[0], str):
-        processed['categories'] = processed['categories'].apply(eval)
+        processed['categories'] = _parse_json_column(processed['categories'])
+    elif not isinstance(processed['categories'].iloc[0], list):
+        # Parquet list columns come back as NumPy arrays; keep plain lists
+        processed['categories'] = processed['categories'].map(list)
+    processed['categories'] = _category_titles(processed['categories'])
     
-    # Extract lat and long from coordinates
-    processed['lat'] = processed['coordinates'].apply(lambda x: eval(x)['latitude'])
-    processed['long'] = processed['coordinates'].apply(lambda x: eval(x)['longitude'])
+    if 'latitude' in processed.columns:
+        # Coordinates already flattened by YelpDeliveryLoader
+        processed['lat'] = processed['latitude']
+        processed['long'] = processed['longitude']
+    else:
+        # Older snapshots: extract lat and long from the nested coordinates
+        coordinates = processed['coordinates']
+        if isinstance(coordinates.iloc[0], str):
+            coordinates = _parse_json_column(coordinates)
+        coords = pd.json_normalize(coordinates.tolist())
+        processed['lat'] = coords['latitude'].to_numpy()
+        processed['long'] = coords['longitude'].to_numpy()
     
     # Map price to numeric category
     price_map = {'$': 1, '$$': 2, '$$$': 3, '$$$$': 4}
@@ -66,7 +194,26 @@ def _process_yelp_data(df: pd.DataFrame) -> pd.DataFrame:
     return processed[[
         'id', 'name', 'review_count', 'rating', 
         'categories', 'lat', 'long', 'price_category', 'cluster_id'
-    ]].assign(source='yelp')
+    ]].astype(PROCESSED_DTYPES).assign(source='yelp')
+
+def _category_titles(categories: pd.Series) -> pd.Series:
+    """Reduce raw Yelp category dicts (older snapshots) to their titles, as YelpDeliveryLoader does."""
+    sample = next((cats for cats in categories if len(cats)), None)
+    if sample is None or not isinstance(sample[0], dict):
+        return categories
+    return categories.map(lambda cats: [cat['title'] for cat in cats])
+
+def _parse_json_column(series: pd.Series) -> pd.Series:
+    """Parse a column of Python-repr dicts/lists (as written by ``to_csv``) into objects."""
+    return series.map(_parse_literal)
+
+def _parse_literal(value: str) -> Any:
+    """Parse one Python-repr literal, trying the JSON fast path before ast.literal_eval."""
+    try:
+        return json.loads(value.replace("'", '"'))
+    except ValueError:
+        # Not JSON-compatible (e.g. apostrophes, None, True/False)
+        return ast.literal_eval(value)
 
 def _process_opentable_data(df: pd.DataFrame) -> pd.DataFrame:
     """Process OpenTable data to match required format."""
@@ -93,4 +240,4 @@ def _process_opentable_data(df: pd.DataFrame) -> pd.DataFrame:
         'reviewCount': 'review_count',
         'latitude': 'lat',
         'longitude': 'long'
-    }).assign(source='opentable') 
\ No newline at end of file
+    }).astype(PROCESSED_DTYPES).assign(source='opentable') 
\ No newline at end of file
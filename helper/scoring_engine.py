@@ -1,10 +1,46 @@
 import pandas as pd
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import logging
 from pathlib import Path
 from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# Combined-data columns analyze_clusters uses, so readers can project them
+REQUIRED_COLUMNS = ['id', 'cluster_id', 'categories', 'review_count', 'rating', 'price_category']
+
+# Types for the identifier columns; the numeric columns are left to type
+# inference, since older combined files store counts as floats (e.g. '10.0')
+REQUIRED_COLUMN_TYPES = {
+    'id': pa.string(),
+    'cluster_id': pa.int64()  # KMeans cluster labels
+}
+
+def _has_category(categories: pd.Series, target_category: str) -> pd.Series:
+    """
+    Flag rows whose categories contain the target category.
+    
+    Args:
+        categories (pd.Series): List-like categories, or their string form when read back from CSV
+        target_category (str): Category to look for
+        
+    Returns:
+        pd.Series: Boolean mask aligned with categories
+    """
+    if pd.api.types.infer_dtype(categories, skipna=True) == 'string':
+        # Stringified lists: substring match, as `in` does on a string
+        return categories.str.contains(target_category, regex=False, na=False).astype(bool)
+    
+    # List-like categories: explode and test element equality
+    return (
+        categories.explode().eq(target_category)
+        .groupby(level=0).any()
+        .reindex(categories.index, fill_value=False)
+    )
+
 def get_cluster_profiles(df: pd.DataFrame, target_category: str = None) -> pd.DataFrame:
     """
     Analyze cluster profiles for restaurants.
@@ -16,87 +52,103 @@ def get_cluster_profiles(df: pd.DataFrame, target_category: str = None) -> pd.Da
     Returns:
         pd.DataFrame: Cluster statistics
     """
-    # If no target category, use all data
+    # Flag the businesses in the target category (all of them if no target)
     if target_category is None:
-        cat_df = df.copy()
+        is_target = pd.Series(True, index=df.index)
     else:
-        # Normalize category column for easier filtering
-        df['has_target_category'] = df['categories'].apply(lambda cats: target_category in cats)
-        # Filter by only relevant businesses for the target category
-        cat_df = df[df['has_target_category'] == True]
-
-    cluster_stats = cat_df.groupby('cluster_id').agg({
-        'id': 'count',  # competition
-        'review_count': 'sum',  # proxy for demand
-        'rating': 'mean',
-        'price_category': 'mean'
-    }).rename(columns={
-        'id': 'category_count',
-        'review_count': 'total_footfall',
-        'rating': 'avg_rating',
-        'price_category': 'avg_price'
-    })
-
-    # Add total businesses in each cluster
-    total_cluster_businesses = df.groupby('cluster_id')['id'].count().rename('business_density')
-    cluster_stats = cluster_stats.join(total_cluster_businesses)
-
-    return cluster_stats.reset_index()
-
-from sklearn.preprocessing import MinMaxScaler
-
-def rank_clusters(cluster_df: pd.DataFrame, capital: str = 'Low', risk: str = 'Low') -> pd.DataFrame:
-    df = cluster_df.copy()
-
-    # Normalize key features to 0–1
-    features_to_normalize = ['total_footfall', 'avg_rating', 'avg_price', 'category_count']
-    scaler = MinMaxScaler()
-    df_norm = pd.DataFrame(scaler.fit_transform(df[features_to_normalize]), columns=features_to_normalize)
-
-    # Combine normalized features into the dataframe
-    for col in features_to_normalize:
-        df[f'norm_{col}'] = df_norm[col]
-
-    # Scoring logic with normalized values
-    if capital == 'Low' and risk == 'Low':
-        df['score'] = (
-            -3.0 * df['norm_category_count'] +
-            -2.0 * df['norm_total_footfall'] +
-            -1.0 * df['norm_avg_price'] +
-            1.0 * df['norm_avg_rating']
-        )
-
-    elif capital == 'Low' and risk == 'High':
-        df['score'] = (
-            2.0 * df['norm_total_footfall'] +
-            -2.5 * df['norm_avg_rating'] +
-            -1.5 * df['norm_category_count'] +
-            -1.0 * df['norm_avg_price']
+        is_target = _has_category(df['categories'], target_category)
+
+    # Single parallel groupby in Polars: category stats only see target
+    # businesses while business_density counts every business
+    stats_input = pl.from_pandas(pd.DataFrame({
+        'cluster_id': df['cluster_id'],
+        'id': df['id'],
+        'review_count': df['review_count'],
+        'rating': df['rating'],
+        'price_category': df['price_category'],
+        'is_target': is_target.to_numpy(dtype=bool)
+    }))
+    target = pl.col('is_target')
+    cluster_stats = (
+        stats_input.group_by('cluster_id', maintain_order=True)
+        .agg(
+            pl.col('id').filter(target).count().alias('category_count'),  # competition
+            pl.col('review_count').filter(target).sum().alias('total_footfall'),  # proxy for demand
+            pl.col('rating').filter(target).mean().alias('avg_rating'),
+            pl.col('price_category').filter(target).mean().alias('avg_price'),
+            pl.col('id').count().alias('business_density')
         )
+        # Keep only clusters that contain the target category
+        .filter(pl.col('category_count') > 0)
+    )
 
+    # Arrow-backed hand-off back to pandas at the API boundary
+    return cluster_stats.to_pandas()
 
-    elif capital == 'High' and risk == 'High':
-        df['score'] = (
-            3.0 * df['norm_total_footfall'] +
-            2.5 * df['norm_avg_rating'] +
-            1.5 * df['norm_category_count'] +
-            1.0 * df['norm_avg_price']
-        )
+# Key features normalized to 0–1 before scoring
+FEATURES_TO_NORMALIZE = ['total_footfall', 'avg_rating', 'avg_price', 'category_count']
 
-    elif capital == 'High' and risk == 'Low':
-        df['score'] = (
-            2.5 * df['norm_total_footfall'] +
-            -3.0 * df['norm_category_count'] +
-            1.5 * df['norm_avg_rating'] +
-            0.5 * df['norm_avg_price']
-        )
+def _normalize_features(cluster_df: pd.DataFrame) -> np.ndarray:
+    """
+    Min-max scale the scoring features of each cluster.
+    
+    Args:
+        cluster_df (pd.DataFrame): Cluster statistics from get_cluster_profiles
+        
+    Returns:
+        np.ndarray: Array of shape (n_clusters, 4) in FEATURES_TO_NORMALIZE order
+    """
+    features = cluster_df[FEATURES_TO_NORMALIZE].to_numpy(dtype=float)
+    feature_min = np.nanmin(features, axis=0)
+    feature_range = np.nanmax(features, axis=0) - feature_min
+    # Constant features scale to 0, matching MinMaxScaler
+    feature_range[feature_range == 0] = 1.0
+    return (features - feature_min) / feature_range
+
+# Business strategies as (name, capital, risk)
+STRATEGIES = [
+    ('Low_Capital_Low_Risk', 'Low', 'Low'),
+    ('High_Capital_High_Risk', 'High', 'High'),
+    ('Low_Capital_High_Risk', 'Low', 'High'),
+    ('High_Capital_Low_Risk', 'High', 'Low')
+]
+
+# Scoring weights per strategy (rows, aligned with STRATEGIES) over the
+# normalized features (columns, aligned with FEATURES_TO_NORMALIZE)
+STRATEGY_WEIGHTS = np.array([
+    # footfall, rating, price, competition
+    [-2.0,  1.0, -1.0, -3.0],  # Low capital, low risk
+    [ 3.0,  2.5,  1.0,  1.5],  # High capital, high risk
+    [ 2.0, -2.5, -1.0, -1.5],  # Low capital, high risk
+    [ 2.5,  1.5,  0.5, -3.0],  # High capital, low risk
+])
+
+def _build_ranking(cluster_df: pd.DataFrame, norm_features: np.ndarray, scores: np.ndarray) -> pd.DataFrame:
+    """Attach normalized features and scores to the clusters and sort by score."""
+    df = cluster_df.copy()
 
+    # Combine normalized features into the dataframe
+    for i, col in enumerate(FEATURES_TO_NORMALIZE):
+        df[f'norm_{col}'] = norm_features[:, i]
 
+    df['score'] = scores
     return df.sort_values(by='score', ascending=False)
 
+def rank_clusters(cluster_df: pd.DataFrame, capital: str = 'Low', risk: str = 'Low',
+                  norm_features: np.ndarray = None) -> pd.DataFrame:
+    # Normalize key features to 0–1 unless already computed by the caller
+    if norm_features is None:
+        norm_features = _normalize_features(cluster_df)
 
+    strategy_index = next(
+        (i for i, (_, c, r) in enumerate(STRATEGIES) if (c, r) == (capital, risk)),
+        None
+    )
+    if strategy_index is None:
+        raise ValueError(f"Unknown strategy: capital={capital}, risk={risk}")
 
-
+    scores = norm_features @ STRATEGY_WEIGHTS[strategy_index]
+    return _build_ranking(cluster_df, norm_features, scores)
 
 
 def analyze_clusters(combined_data: pd.DataFrame, output_dir: Path, target_category: str = None) -> None:
@@ -119,21 +171,28 @@ def analyze_clusters(combined_data: pd.DataFrame, output_dir: Path, target_categ
     # Get cluster profiles
     cluster_df = get_cluster_profiles(combined_data, target_category)
     
-    # Analyze for different business strategies
-    strategies = [
-        ('Low_Capital_Low_Risk', 'Low', 'Low'),
-        ('High_Capital_High_Risk', 'High', 'High'),
-        ('Low_Capital_High_Risk', 'Low', 'High'),
-        ('High_Capital_Low_Risk', 'High', 'Low')
-    ]
+    # Normalize once and share across all strategies
+    norm_features = _normalize_features(cluster_df)
     
-    for strategy_name, capital, risk in strategies:
+    # Score every strategy at once: (n_clusters, 4) @ (4, n_strategies)
+    all_scores = norm_features @ STRATEGY_WEIGHTS.T
+    
+    # Analyze for different business strategies
+    rankings = []
+    for i, (strategy_name, capital, risk) in enumerate(STRATEGIES):
         logger.info(f"\nAnalyzing {strategy_name} strategy:")
-        ranked = rank_clusters(cluster_df, capital, risk)
+        ranked = _build_ranking(cluster_df, norm_features, all_scores[:, i])
         logger.info(f"Top 5 clusters for {strategy_name}:")
         logger.info(ranked.head().to_string())
-        
-        # Save results with simplified naming
+        rankings.append(ranked)
+    
+    # Convert all rankings to Arrow in one batch, then write each strategy's
+    # slice (zero-copy) with simplified naming; the Streamlit app looks the
+    # files up by strategy name
+    table = pa.Table.from_pandas(pd.concat(rankings, ignore_index=True), preserve_index=False)
+    offset = 0
+    for (strategy_name, _, _), ranked in zip(STRATEGIES, rankings):
         output_file = output_dir / f'cluster_analysis_{strategy_name}.csv'
-        ranked.to_csv(output_file, index=False)
+        pacsv.write_csv(table.slice(offset, len(ranked)), output_file)
+        offset += len(ranked)
         logger.info(f"Saved analysis to {output_file}") 
\ No newline at end of file
@@ -2,13 +2,13 @@
 API data loader implementation for Yelp data.
 """
 import pandas as pd
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import logging
 from pathlib import Path
-import json
-import time
-import requests
-from .base_loader import BaseLoader
+import orjson
+import asyncio
+import aiohttp
+from .base_loader import BaseLoader, RateLimiter, run_async, create_session, fetch_with_retries
 from config import settings
 
 class YelpDeliveryLoader(BaseLoader):
@@ -29,24 +29,24 @@ class YelpDeliveryLoader(BaseLoader):
         self.centroids_file = Path(settings.DATA_DIR) / 'semi_processed' / 'cluster_centroids.json'
         self.centroids = self._load_centroids()
         
-    def _load_centroids(self) -> Dict[str, Dict[str, float]]:
-        """
-        Load cluster centroids from JSON file.
+        # Resolve settings and request templates once instead of per call
+        yelp_settings = settings.DATA_SOURCES['yelp']
+        self.max_concurrent_requests = yelp_settings['max_concurrent_requests']
+        self.rate_limiter = RateLimiter(yelp_settings['requests_per_second'])
+        self.page_size = yelp_settings['limit']
+        self.max_results = yelp_settings['max_results']
+        self.max_retries = settings.PROCESSING['max_retries']
+        self.retry_backoff_factor = settings.PROCESSING['retry_backoff_factor']
+        self.use_cache = self.config.get('use_cache', settings.PROCESSING['use_cache'])
+        self.cache_dir = Path(settings.PROCESSING['cache_dir']) / 'yelp'
+        self.search_url = f"{self.base_url}/businesses/search"
+        self.headers = {
+            'Authorization': f'Bearer {self.api_key}'
+        }
+        self.search_params = {
+            'radius': 1000  # 1km radius
+        }
         
-        Returns:
-            Dict[str, Dict[str, float]]: Dictionary of cluster centroids
-        """
-        try:
-            if not self.centroids_file.exists():
-                raise FileNotFoundError(f"Centroids file not found: {self.centroids_file}")
-                
-            with open(self.centroids_file, 'r') as f:
-                return json.load(f)
-                
-        except Exception as e:
-            logging.error(f"Error loading centroids: {str(e)}")
-            raise
-    
     def load_data(self) -> pd.DataFrame:
         """
         Load data from Yelp API.
@@ -55,31 +55,16 @@ class YelpDeliveryLoader(BaseLoader):
             pd.DataFrame: DataFrame containing API data
         """
         try:
-            all_data = []
-            
-            # Process each cluster centroid
-            for cluster_id, coords in self.centroids.items():
-                logging.info(f"Loading Yelp data for cluster {cluster_id} at coordinates: ({coords['latitude']}, {coords['longitude']})")
-                
-                # Get data for this location
-                location_data = self._get_location_data(coords['latitude'], coords['longitude'])
-                all_data.extend(location_data)
-                
-                # Add cluster information
-                for item in location_data:
-                    item['cluster_id'] = cluster_id
-                
-                # Log count of items for this location
-                logging.info(f"Found {len(location_data)} businesses at coordinates ({coords['latitude']}, {coords['longitude']})")
-                
-                # Respect rate limits with 3 second delay
-                time.sleep(3)
+            # Fetch all cluster centroids concurrently
+            results = run_async(self._load_data_async())
             
-            # Convert to DataFrame
-            df = pd.DataFrame(all_data)
+            # Drop duplicate businesses by ID before building any rows
+            all_data, cluster_ids = self._flatten_results(results, 'id')
             
-            # Drop duplicate rows based on business ID
-            df = df.drop_duplicates(subset=['id'], keep='first')
+            # Convert to a flat DataFrame; cluster IDs are attached as one column
+            # rather than written into every record
+            df = self._parse_businesses(all_data)
+            df['cluster_id'] = cluster_ids
             
             logging.info(f"Loaded {len(df)} unique businesses from Yelp API")
             
@@ -89,46 +74,154 @@ class YelpDeliveryLoader(BaseLoader):
             logging.error(f"Error loading Yelp data: {str(e)}")
             raise
     
-    def _get_location_data(self, latitude: float, longitude: float) -> List[Dict[str, Any]]:
+    async def _load_data_async(self) -> List[List[Dict[str, Any]]]:
         """
-        Get data for a specific location from Yelp API.
+        Fetch business data for every cluster centroid concurrently.
+        
+        Returns:
+            List[List[Dict[str, Any]]]: Business data per cluster
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        async with create_session(self.headers, self.max_concurrent_requests) as session:
+            return await asyncio.gather(*(
+                self._load_cluster_data(session, semaphore, cluster_id, coords)
+                for cluster_id, coords in self.centroids.items()
+            ))
+    
+    async def _load_cluster_data(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                 cluster_id: str, coords: Dict[str, float]) -> List[Dict[str, Any]]:
+        """
+        Fetch business data for a single cluster centroid.
         
         Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            semaphore (asyncio.Semaphore): Bounds the number of in-flight requests
+            cluster_id (str): Cluster identifier
+            coords (Dict[str, float]): Centroid coordinates
+            
+        Returns:
+            List[Dict[str, Any]]: List of business data for the cluster
+        """
+        # Reuse today's results for this cluster without touching the API
+        cached = self._read_cache(cluster_id, coords)
+        if cached is not None:
+            logging.info(f"Using cached Yelp data for cluster {cluster_id}")
+            return cached
+        
+        logging.info(f"Loading Yelp data for cluster {cluster_id} at coordinates: ({coords['latitude']}, {coords['longitude']})")
+        
+        # The first page reports how many businesses the area has; fetch the
+        # remaining pages (up to Yelp's result cap) concurrently
+        first_page = await self._load_page(session, semaphore, coords, 0)
+        if first_page is None:
+            return []
+        location_data, total = first_page
+        offsets = range(self.page_size, min(total, self.max_results), self.page_size)
+        pages = await asyncio.gather(*(
+            self._load_page(session, semaphore, coords, offset) for offset in offsets
+        ))
+        complete = True
+        for page in pages:
+            if page is None:
+                complete = False
+                continue
+            location_data.extend(page[0])
+        
+        # Log count of items for this location
+        logging.info(f"Found {len(location_data)} businesses at coordinates ({coords['latitude']}, {coords['longitude']})")
+        
+        # Only cache complete results, so a failed page is fetched again on
+        # the next run instead of serving a truncated cluster all day
+        if location_data and complete:
+            self._write_cache(cluster_id, coords, location_data)
+            
+        return location_data
+    
+    async def _load_page(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                         coords: Dict[str, float], offset: int) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """
+        Fetch one page of results for a centroid within the shared rate limit.
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            semaphore (asyncio.Semaphore): Bounds the number of in-flight requests
+            coords (Dict[str, float]): Centroid coordinates
+            offset (int): Index of the first result to return
+            
+        Returns:
+            Optional[Tuple[List[Dict[str, Any]], int]]: Business data and the total number
+                of matches, or None if the request failed
+        """
+        async with semaphore:
+            page = await self._get_location_data(session, coords['latitude'], coords['longitude'], offset)
+            
+        return page
+    
+    async def _get_location_data(self, session: aiohttp.ClientSession, latitude: float, longitude: float,
+                                 offset: int = 0) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """
+        Get a page of data for a specific location from Yelp API.
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
             latitude (float): Latitude coordinate
             longitude (float): Longitude coordinate
+            offset (int): Index of the first result to return
             
         Returns:
-            List[Dict[str, Any]]: List of business data
+            Optional[Tuple[List[Dict[str, Any]], int]]: Business data and the total number
+                of matches, or None if the request failed
         """
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}'
-            }
-            
             params = {
                 'latitude': latitude,
                 'longitude': longitude,
-                'radius': 1000,  # 1km radius
-                'limit': 50,
-                'offset': 51
+                'offset': offset,
+                # Yelp rejects offset + limit beyond its result cap
+                'limit': min(self.page_size, self.max_results - offset),
+                **self.search_params
             }
             
-            response = requests.get(
-                f"{self.base_url}/businesses/search",
-                headers=headers,
-                params=params
+            status, body = await fetch_with_retries(
+                session, self.search_url, params=params,
+                max_retries=self.max_retries, backoff_factor=self.retry_backoff_factor,
+                rate_limiter=self.rate_limiter
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('businesses', [])
+            if status == 200:
+                data = orjson.loads(body)
+                return data.get('businesses', []), data.get('total', 0)
             else:
-                logging.error(f"API request failed with status {response.text}")
-                return []
+                logging.error(f"API request failed with status {status}: {body.decode(errors='replace')}")
+                return None
                 
         except Exception as e:
             logging.error(f"Error getting location data: {str(e)}")
-            return []
+            return None
+    
+    def _parse_businesses(self, businesses: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Flatten raw Yelp business records into a DataFrame.
+        
+        Args:
+            businesses (List[Dict[str, Any]]): Business records from the API
+            
+        Returns:
+            pd.DataFrame: One row per business with nested fields as columns
+        """
+        # Nested dicts become dotted columns (e.g. location.city) in one pass
+        df = pd.json_normalize(businesses)
+        df = df.rename(columns={
+            'coordinates.latitude': 'latitude',
+            'coordinates.longitude': 'longitude'
+        })
+        
+        # Keep only the category titles
+        if 'categories' in df.columns:
+            df['categories'] = df['categories'].map(
+                lambda cats: [cat['title'] for cat in cats] if isinstance(cats, list) else []
+            )
+        
+        return df
     
     def validate_data(self, data: pd.DataFrame) -> bool:
         """
@@ -1,9 +1,161 @@
 """
 Base loader class that defines the interface for all data loaders.
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Coroutine, Tuple, List
+import asyncio
+import time
+import orjson
 import logging
+import aiohttp
+from pathlib import Path
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+def run_async(coro: Coroutine) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    Uses asyncio.run, or a worker thread when an event loop is already
+    running in this thread (e.g. inside a Jupyter notebook).
+    
+    Args:
+        coro (Coroutine): Coroutine to run
+        
+    Returns:
+        Any: Result of the coroutine
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+# Parsed centroid files keyed by (path, modification time), shared by all loaders
+_CENTROIDS_CACHE: Dict[Tuple[str, int], Dict[str, Dict[str, float]]] = {}
+
+# Transient HTTP statuses worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def create_session(headers: Dict[str, str], max_connections: int) -> aiohttp.ClientSession:
+    """
+    Create an HTTP session with a pooled, keep-alive connector.
+    
+    Connections (and their TLS handshakes) and DNS lookups are reused
+    across every request made through the session.
+    
+    Args:
+        headers (Dict[str, str]): Default headers sent with every request
+        max_connections (int): Size of the connection pool
+        
+    Returns:
+        aiohttp.ClientSession: Session to use for all requests of a load
+    """
+    connector = aiohttp.TCPConnector(
+        limit=max_connections,
+        limit_per_host=max_connections,
+        ttl_dns_cache=300
+    )
+    timeout = aiohttp.ClientTimeout(total=30)
+    return aiohttp.ClientSession(headers=headers, timeout=timeout, connector=connector)
+
+# Upper bound in seconds on any single retry wait, including server-sent Retry-After
+MAX_RETRY_DELAY = 30
+
+class RateLimiter:
+    """
+    Space requests evenly at a fixed rate across all tasks of a load.
+    
+    Each caller reserves the next free time slot and sleeps until it; the
+    slot schedule uses the monotonic clock, so it is unaffected by wall-clock
+    changes and carries over between event loops.
+    """
+    
+    def __init__(self, requests_per_second: float):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            requests_per_second (float): Maximum sustained request rate
+        """
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = 0.0
+    
+    async def acquire(self) -> None:
+        """Wait for the next request slot."""
+        # Reserving the slot happens before any await, so concurrent tasks
+        # on the event loop always get distinct slots
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every request for a while, e.g. when the server asks us to slow down.
+        
+        Args:
+            seconds (float): Seconds from now before the next slot
+        """
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    """
+    Read the delay a throttling server asked for, if it sent one in seconds.
+    
+    Args:
+        response (aiohttp.ClientResponse): Response to a request
+        
+    Returns:
+        Optional[float]: Seconds to wait, or None if no usable Retry-After header was sent
+    """
+    try:
+        return max(0.0, float(response.headers['Retry-After']))
+    except (KeyError, ValueError):
+        return None
+
+async def fetch_with_retries(session: aiohttp.ClientSession, url: str,
+                             params: Optional[Dict[str, Any]] = None,
+                             max_retries: int = 3, backoff_factor: float = 0.3,
+                             rate_limiter: Optional[RateLimiter] = None) -> Tuple[int, bytes]:
+    """
+    GET a URL, retrying connection errors and transient statuses with exponential backoff.
+    
+    A Retry-After header on a throttled response takes precedence over the
+    computed backoff, and also pauses the shared rate limiter so other
+    in-flight tasks back off too.
+    
+    Args:
+        session (aiohttp.ClientSession): Shared HTTP session
+        url (str): URL to fetch
+        params (Dict[str, Any], optional): Query parameters
+        max_retries (int): Retries after the first attempt
+        backoff_factor (float): Base delay in seconds, doubled after each attempt
+        rate_limiter (RateLimiter, optional): Limiter every attempt waits on
+        
+    Returns:
+        Tuple[int, bytes]: Status code and body of the last response
+    """
+    for attempt in range(max_retries + 1):
+        delay = backoff_factor * (2 ** attempt)
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status not in RETRY_STATUSES or attempt == max_retries:
+                    return response.status, await response.read()
+                retry_after = _retry_after(response)
+                if retry_after is not None:
+                    delay = retry_after
+                    if rate_limiter is not None:
+                        rate_limiter.pause(min(delay, MAX_RETRY_DELAY))
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == max_retries:
+                raise
+        await asyncio.sleep(min(delay, MAX_RETRY_DELAY))
 
 class BaseLoader(ABC):
     """
@@ -43,6 +195,107 @@ class BaseLoader(ABC):
         """
         pass
     
+    def _load_centroids(self) -> Dict[str, Dict[str, float]]:
+        """
+        Load cluster centroids from JSON file, parsing each version of the file only once.
+        
+        Returns:
+            Dict[str, Dict[str, float]]: Dictionary of cluster centroids
+        """
+        try:
+            if not self.centroids_file.exists():
+                raise FileNotFoundError(f"Centroids file not found: {self.centroids_file}")
+            
+            # A rewritten file (e.g. after re-clustering) gets a new key
+            key = (str(Path(self.centroids_file).resolve()), self.centroids_file.stat().st_mtime_ns)
+            if key not in _CENTROIDS_CACHE:
+                _CENTROIDS_CACHE[key] = orjson.loads(self.centroids_file.read_bytes())
+            
+            return dict(_CENTROIDS_CACHE[key])
+                
+        except Exception as e:
+            logging.error(f"Error loading centroids: {str(e)}")
+            raise
+    
+    def _flatten_results(self, results: List[List[Dict[str, Any]]], id_key: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Flatten per-cluster results, keeping the first record seen for each ID.
+        
+        Nearby centroids return overlapping businesses, so duplicates are
+        dropped here before any DataFrame rows are allocated.
+        
+        Args:
+            results (List[List[Dict[str, Any]]]): Records per cluster, in centroid order
+            id_key (str): Record field identifying a business
+            
+        Returns:
+            Tuple[List[Dict[str, Any]], List[str]]: Unique records and the cluster ID of each
+        """
+        seen = set()
+        records, cluster_ids = [], []
+        for cluster_id, location_data in zip(self.centroids, results):
+            for item in location_data:
+                key = item.get(id_key)
+                if key in seen:
+                    continue
+                seen.add(key)
+                records.append(item)
+                cluster_ids.append(cluster_id)
+        return records, cluster_ids
+    
+    def _cache_path(self, cluster_id: str, coords: Dict[str, float]) -> Path:
+        """
+        Path of today's cached results for a cluster.
+        
+        Args:
+            cluster_id (str): Cluster identifier
+            coords (Dict[str, float]): Centroid coordinates (re-clustering changes them)
+            
+        Returns:
+            Path: Cache file in the loader's cache directory
+        """
+        date = datetime.now().strftime('%Y%m%d')
+        return self.cache_dir / f"{cluster_id}_{coords['latitude']:.4f}_{coords['longitude']:.4f}_{date}.json"
+    
+    def _read_cache(self, cluster_id: str, coords: Dict[str, float]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read today's cached results for a cluster, if caching is enabled and they exist.
+        
+        Args:
+            cluster_id (str): Cluster identifier
+            coords (Dict[str, float]): Centroid coordinates
+            
+        Returns:
+            Optional[List[Dict[str, Any]]]: Cached records, or None on a cache miss
+        """
+        if not self.use_cache:
+            return None
+        cache_file = self._cache_path(cluster_id, coords)
+        if not cache_file.exists():
+            return None
+        try:
+            return orjson.loads(cache_file.read_bytes())
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable cache file {cache_file}: {str(e)}")
+            return None
+    
+    def _write_cache(self, cluster_id: str, coords: Dict[str, float], records: List[Dict[str, Any]]) -> None:
+        """
+        Cache a cluster's fetched results for the rest of the day.
+        
+        Args:
+            cluster_id (str): Cluster identifier
+            coords (Dict[str, float]): Centroid coordinates
+            records (List[Dict[str, Any]]): Records to cache
+        """
+        if not self.use_cache:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._cache_path(cluster_id, coords).write_bytes(orjson.dumps(records))
+        except Exception as e:
+            logging.warning(f"Error caching results for cluster {cluster_id}: {str(e)}")
+    
     def get_metadata(self) -> Dict[str, Any]:
         """
         Get metadata about the loaded data.
@@ -6,14 +6,23 @@ import numpy as np
 from typing import Dict, Any, Optional
 import logging
 from pathlib import Path
-import json
+import orjson
+import pyarrow.csv as pacsv
 from geopy.geocoders import Nominatim
-import shapely.wkt
-from shapely.geometry import shape
-from sklearn.cluster import KMeans
+import geopandas as gpd
+import shapely
+from shapely.geometry import Point
+from sklearn.cluster import MiniBatchKMeans
 from .base_loader import BaseLoader
 from config import settings
 
+# Zoning columns used downstream (validation, centroids and clustering)
+ZONING_COLUMNS = ['SHAPE_Len', 'SHAPE_Area', 'ZONE_CMPLT', 'the_geom']
+
+# Bytes per parse block; zoning rows carry long WKT polygons, so use larger
+# blocks than Arrow's 1 MB default
+CSV_BLOCK_SIZE = 16 << 20
+
 class CSVLoader(BaseLoader):
     """
     Loader for CSV data sources (zoning data).
@@ -29,13 +38,20 @@ class CSVLoader(BaseLoader):
         super().__init__(config)
         self.zoning_file = settings.DATA_SOURCES['csv']['zoning_file']
         self.geolocator = Nominatim(user_agent="geocoding_app")
+        self.zcta_file = Path(settings.DATA_SOURCES['csv']['zcta_file'])
+        self.zcta_column = settings.DATA_SOURCES['csv']['zcta_column']
+        self._zctas = None  # ZIP code polygons, loaded on first lookup
         self.n_clusters = config.get('n_clusters', 1000) if config else 1000
         self.centroids_file = Path(settings.DATA_DIR) / 'semi_processed' / 'cluster_centroids.json'
+        self._cluster_centers = None  # (n_clusters, 2) lat/long array set by _perform_clustering
     
     def get_zipcode(self, latitude: float, longitude: float) -> Optional[str]:
         """
         Get zipcode from latitude and longitude coordinates.
         
+        Uses a point-in-polygon lookup against the local ZCTA file when it is
+        available, falling back to Nominatim reverse geocoding otherwise.
+        
         Args:
             latitude (float): Latitude coordinate
             longitude (float): Longitude coordinate
@@ -44,36 +60,33 @@ class CSVLoader(BaseLoader):
             Optional[str]: Zipcode if found, None otherwise
         """
         try:
+            zctas = self._load_zctas()
+            if zctas is not None:
+                # R-tree bounding-box search plus exact containment test in one query
+                matches = zctas.sindex.query(Point(longitude, latitude), predicate='within')
+                return zctas[self.zcta_column].iloc[matches[0]] if len(matches) else None
+            
             location = self.geolocator.reverse((latitude, longitude), exactly_one=True)
             if location:
-                print(location.raw['address'].get('postcode'))
                 return location.raw['address'].get('postcode')
         except Exception as e:
             logging.warning(f"Error getting zipcode for coordinates ({latitude}, {longitude}): {str(e)}")
         return None
-
-    def _calculate_centroid(self, geometry_str: str) -> Optional[Dict[str, float]]:
+    
+    def _load_zctas(self) -> Optional[gpd.GeoDataFrame]:
         """
-        Calculate centroid coordinates from WKT geometry string.
+        Load the ZIP code polygons once and build their spatial index.
         
-        Args:
-            geometry_str (str): WKT geometry string
-            
         Returns:
-            Optional[Dict[str, float]]: Dictionary with latitude and longitude if successful, None otherwise
+            Optional[gpd.GeoDataFrame]: ZCTA polygons in WGS84, or None if no ZCTA file is available
         """
-        try:
-            # Parse WKT geometry
-            geom = shapely.wkt.loads(geometry_str)
-            # Calculate centroid
-            centroid = geom.centroid
-            return {
-                'latitude': centroid.y,  # Note: y is latitude in WKT
-                'longitude': centroid.x  # Note: x is longitude in WKT
-            }
-        except Exception as e:
-            logging.warning(f"Error calculating centroid: {str(e)}")
-            return None
+        if self._zctas is None and self.zcta_file.exists():
+            zctas = gpd.read_file(self.zcta_file)[[self.zcta_column, 'geometry']]
+            if zctas.crs is not None and zctas.crs.to_epsg() != 4326:
+                zctas = zctas.to_crs(epsg=4326)
+            zctas.sindex  # Build the R-tree now rather than on the first lookup
+            self._zctas = zctas
+        return self._zctas
 
     def _perform_clustering(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -90,49 +103,52 @@ class CSVLoader(BaseLoader):
             df['lat_rounded'] = df['centroid_latitude'].round(4)
             df['long_rounded'] = df['centroid_longitude'].round(4)
             
-            # Calculate frequency of each coordinate pair
-            freq_df = df.groupby(['lat_rounded', 'long_rounded']).size().reset_index(name='frequency')
+            # Calculate frequency of each coordinate pair, and which pair each
+            # row belongs to (NaN for rows without coordinates)
+            grouped = df.groupby(['lat_rounded', 'long_rounded'])
+            freq_df = grouped.size().reset_index(name='frequency')
+            row_group = grouped.ngroup()
             
-            # Use frequency as weights by repeating rows
-            repeated_rows = freq_df.loc[freq_df.index.repeat(freq_df['frequency'])].reset_index(drop=True)
-            coords = repeated_rows[['lat_rounded', 'long_rounded']].to_numpy()
+            # Mini-batch KMeans on the unique coordinates, weighted by frequency;
+            # full-batch Lloyd iterations are slow with 1000 clusters
+            # C-contiguous float64 input goes straight to sklearn's multithreaded
+            # OpenMP kernels without an internal copy. float32 is not used: with
+            # raw lat/long it loses the precision the distance computations need
+            coords = np.ascontiguousarray(freq_df[['lat_rounded', 'long_rounded']].to_numpy(dtype=np.float64))
             
-            # KMeans clustering
-            kmeans = KMeans(n_clusters=self.n_clusters, random_state=42)
-            labels = kmeans.fit_predict(coords)
+            # Fitting on unique coordinates needs at least one per cluster;
+            # with fewer, give each distinct coordinate its own cluster
+            n_clusters = min(self.n_clusters, len(freq_df))
+            if n_clusters < self.n_clusters:
+                logging.warning(
+                    f"Only {len(freq_df)} distinct coordinates for {self.n_clusters} clusters; "
+                    f"using {n_clusters} clusters"
+                )
+            kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, batch_size=4096, n_init=3)
+            kmeans.fit(coords, sample_weight=freq_df['frequency'].to_numpy())
             
-            # Assign cluster labels back to repeated rows
-            repeated_rows['cluster'] = labels
+            # Keep the centers (at the precision of centroid_coord) for save_centroids
+            self._cluster_centers = kmeans.cluster_centers_.round(4)
             
-            # Map cluster label back to original (lat_rounded, long_rounded)
-            label_map = repeated_rows.groupby(['lat_rounded', 'long_rounded'])['cluster'].agg(
-                lambda x: x.value_counts().idxmax()
-            ).reset_index()
+            # Each unique (lat_rounded, long_rounded) gets exactly one label;
+            # gather labels onto rows by group position instead of merging
+            has_group = row_group.notna().to_numpy()
+            row_labels = np.full(len(df), -1, dtype=np.intp)
+            row_labels[has_group] = kmeans.labels_[row_group[has_group].to_numpy(dtype=np.intp)]
+            df['cluster'] = np.where(has_group, row_labels, np.nan)
             
-            # Create a mapping of cluster labels to their centroids
-            cluster_centroids = pd.DataFrame(
-                kmeans.cluster_centers_,
-                columns=['centroid_lat', 'centroid_long']
-            )
-            cluster_centroids['cluster'] = range(len(cluster_centroids))
-            
-            # Merge cluster information back to original DataFrame
-            df = df.merge(label_map, on=['lat_rounded', 'long_rounded'], how='left')
-            
-            # Add cluster centroids
-            df = df.merge(cluster_centroids, on='cluster', how='left')
-            
-            # Create centroid_coord column
-            df['centroid_coord'] = df.apply(
-                lambda row: f"({row['centroid_lat']:.4f}, {row['centroid_long']:.4f})" 
-                if pd.notnull(row['cluster']) else None,
-                axis=1
+            # Format each cluster centroid once (K strings) and gather them onto
+            # rows by label; rows without a cluster get a null centroid_coord
+            cluster_coords = np.array(
+                [f"({lat:.4f}, {long:.4f})" for lat, long in kmeans.cluster_centers_],
+                dtype=object
             )
+            df['centroid_coord'] = pd.api.extensions.take(cluster_coords, row_labels, allow_fill=True)
             
             # Drop temporary columns
-            df.drop(['lat_rounded', 'long_rounded', 'centroid_lat', 'centroid_long'], axis=1, inplace=True)
+            df.drop(['lat_rounded', 'long_rounded'], axis=1, inplace=True)
             
-            logging.info(f"Clustering completed. Created {self.n_clusters} clusters")
+            logging.info(f"Clustering completed. Created {n_clusters} clusters")
             return df
             
         except Exception as e:
@@ -171,8 +187,7 @@ class CSVLoader(BaseLoader):
             return False
             
         # Check for required columns
-        required_columns = ['SHAPE_Len','SHAPE_Area','ZONE_CMPLT','the_geom']
-        if not all(col in data.columns for col in required_columns):
+        if not all(col in data.columns for col in ZONING_COLUMNS):
             return False
             
         # Drop rows with empty ZONE_CMPLT
@@ -185,29 +200,36 @@ class CSVLoader(BaseLoader):
         Save cluster centroids to a JSON file.
         
         Args:
-            df (pd.DataFrame): DataFrame containing cluster centroids
+            df (pd.DataFrame): DataFrame with cluster labels from _perform_clustering
         """
         try:
-            # Extract unique centroids
-            centroids = df[['cluster', 'centroid_coord']].drop_duplicates()
-            centroids = centroids[centroids['cluster'] != -1]  # Remove noise points if any
+            if self._cluster_centers is None:
+                raise ValueError("No cluster centers available; run clustering first")
             
-            # Convert to dictionary format
-            centroids_dict = {}
-            for _, row in centroids.iterrows():
-                # Parse the coordinate string
-                coords = row['centroid_coord'].strip('()').split(',')
-                centroids_dict[str(int(row['cluster']))] = {
-                    'latitude': float(coords[0]),
-                    'longitude': float(coords[1])
-                }
+            # Save the centers of the clusters present in the data, straight
+            # from the fitted model
+            clusters = np.unique(df['cluster'].dropna().astype(int))
+            clusters = clusters[clusters != -1]  # Remove noise points if any
+            # Convert to Python floats in one go rather than boxing element by element
+            centers = self._cluster_centers[clusters].tolist()
+            centroids_dict = {
+                str(cluster): {'latitude': lat, 'longitude': long}
+                for cluster, (lat, long) in zip(clusters.tolist(), centers)
+            }
             
             # Create directory if it doesn't exist
             self.centroids_file.parent.mkdir(parents=True, exist_ok=True)
             
             # Save to JSON
-            with open(self.centroids_file, 'w') as f:
-                json.dump(centroids_dict, f, indent=2)
+            self.centroids_file.write_bytes(orjson.dumps(centroids_dict, option=orjson.OPT_INDENT_2))
+            
+            # Also save as Parquet (written after the JSON, so it is never older)
+            # for readers that want a DataFrame without parsing JSON
+            pd.DataFrame({
+                'cluster_id': clusters.astype(np.int32),
+                'lat': self._cluster_centers[clusters, 0],
+                'long': self._cluster_centers[clusters, 1]
+            }).to_parquet(self.centroids_file.with_suffix('.parquet'), engine='pyarrow', index=False)
             
             logging.info(f"Saved {len(centroids_dict)} cluster centroids to {self.centroids_file}")
             
@@ -226,15 +248,25 @@ class CSVLoader(BaseLoader):
         if not file_path.exists():
             raise FileNotFoundError(f"Zoning file not found: {self.zoning_file}")
             
-        df = pd.read_csv(file_path)
+        # Arrow's threaded reader overlaps I/O with parsing outside the GIL and
+        # reads only the columns we use; WKT stays in Arrow string memory
+        # instead of Python str objects. Empty strings are read as nulls, as pandas does
+        df = pacsv.read_csv(
+            file_path,
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE),
+            convert_options=pacsv.ConvertOptions(include_columns=ZONING_COLUMNS, strings_can_be_null=True)
+        ).to_pandas(types_mapper=pd.ArrowDtype)
         
         if not self.validate_data(df):
             raise ValueError("Invalid zoning data format")
         
-        # Calculate centroids and add as separate columns
-        centroids = df['the_geom'].apply(self._calculate_centroid)
-        df['centroid_latitude'] = centroids.apply(lambda x: x['latitude'] if x is not None else None)
-        df['centroid_longitude'] = centroids.apply(lambda x: x['longitude'] if x is not None else None)
+        # Calculate centroids for all geometries at once; missing or
+        # unparseable WKT yields a null geometry and NaN coordinates
+        wkt = df['the_geom'].to_numpy(dtype=object, copy=True)
+        wkt[pd.isna(wkt)] = None
+        centroids = shapely.centroid(shapely.from_wkt(wkt, on_invalid='ignore'))
+        df['centroid_latitude'] = shapely.get_y(centroids)  # Note: y is latitude in WKT
+        df['centroid_longitude'] = shapely.get_x(centroids)  # Note: x is longitude in WKT
         
         # Perform clustering on centroids
         df = self._perform_clustering(df)
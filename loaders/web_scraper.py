@@ -4,18 +4,66 @@ Web scraper implementation for Opentable data.
 import pandas as pd
 from typing import Dict, Any, List, Optional
 import logging
-from bs4 import BeautifulSoup
-import requests
-import time
+import re
+import asyncio
+import aiohttp
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from .base_loader import BaseLoader
+from .base_loader import BaseLoader, RateLimiter, run_async, create_session, fetch_with_retries
 from config import settings
 from datetime import datetime, timedelta
-import json
+import simdjson
+
+# Columns of a parsed listing, in the order built by _parse_business_listing
+LISTING_COLUMNS = [
+    'restaurantId', 'name', 'type', 'profileLink', 'priceBand', 'currencySymbol',
+    'neighborhood', 'recentReservations', 'reviewCount', 'rating', 'primaryCuisine',
+    'isPromoted', 'features', 'diningStyle', 'latitude', 'longitude',
+    'address_line1', 'address_line2', 'city', 'state', 'postcode',
+    'description', 'topReview', 'hasTakeout', 'phone'
+]
+
+# Column dtypes for the listings frame: numbers stay numeric (nullable where
+# OpenTable may omit them) and text is Arrow-backed; features stay lists
+LISTING_DTYPES = {
+    'restaurantId': 'Int64',
+    'recentReservations': 'Int32',
+    'reviewCount': 'Int32',
+    'rating': 'float32',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'isPromoted': 'boolean',
+    'hasTakeout': 'boolean',
+    **{
+        col: 'string[pyarrow]'
+        for col in LISTING_COLUMNS
+        if col not in ('restaurantId', 'recentReservations', 'reviewCount', 'rating',
+                       'latitude', 'longitude', 'isPromoted', 'hasTakeout', 'features')
+    }
+}
+
+# JSON script tags in raw page bytes; script contents are raw text in HTML,
+# so no parse tree is needed to extract them
+_JSON_SCRIPT_RE = re.compile(
+    rb'<script[^>]*\stype=["\']application/json["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Shared default for missing nested sections (read-only)
+_EMPTY: Dict = {}
+
+def _section(parent: Dict, key: str) -> Dict:
+    """
+    Get a nested section of a listing, or an empty dict if it is missing or not an object.
+    
+    Args:
+        parent (Dict): Listing or section to look in
+        key (str): Section name
+        
+    Returns:
+        Dict: The section, or a shared read-only empty dict
+    """
+    value = parent.get(key)
+    return value if isinstance(value, dict) else _EMPTY
 
 class OpentableScraper(BaseLoader):
     """
@@ -36,25 +84,17 @@ class OpentableScraper(BaseLoader):
         self.max_pages = settings.DATA_SOURCES['opentable']['max_pages']
         self.locations = settings.LOCATIONS
         self.delay = settings.PROCESSING['delay_between_requests']
+        self.max_concurrent_requests = settings.DATA_SOURCES['opentable']['max_concurrent_requests']
+        self.rate_limiter = RateLimiter(settings.DATA_SOURCES['opentable']['requests_per_second'])
+        self.max_retries = settings.PROCESSING['max_retries']
+        self.retry_backoff_factor = settings.PROCESSING['retry_backoff_factor']
+        self.use_cache = self.config.get('use_cache', settings.PROCESSING['use_cache'])
+        self.cache_dir = Path(settings.PROCESSING['cache_dir']) / 'opentable'
+        self._json_parser = simdjson.Parser()  # Reused across pages
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+        }
         
-    def _load_centroids(self) -> Dict[str, Dict[str, float]]:
-        """
-        Load cluster centroids from JSON file.
-        
-        Returns:
-            Dict[str, Dict[str, float]]: Dictionary of cluster centroids
-        """
-        try:
-            if not self.centroids_file.exists():
-                raise FileNotFoundError(f"Centroids file not found: {self.centroids_file}")
-                
-            with open(self.centroids_file, 'r') as f:
-                return json.load(f)
-                
-        except Exception as e:
-            logging.error(f"Error loading centroids: {str(e)}")
-            raise
-    
     def load_data(self) -> pd.DataFrame:
         """
         Load data from Opentable website.
@@ -63,31 +103,16 @@ class OpentableScraper(BaseLoader):
             pd.DataFrame: DataFrame containing scraped data
         """
         try:
-            all_data = []
+            # Scrape all cluster centroids concurrently
+            results = run_async(self._load_data_async())
             
-            # Process each cluster centroid
-            for cluster_id, coords in self.centroids.items():
-                logging.info(f"Loading Opentable data for cluster {cluster_id} at coordinates: ({coords['latitude']}, {coords['longitude']})")
-                
-                # Scrape data for this location
-                location_data = self._scrape_location(coords['latitude'], coords['longitude'])
-                all_data.extend(location_data)
-                
-                # Add cluster information
-                for item in location_data:
-                    item['cluster_id'] = cluster_id
-                
-                # Log count of items for this location
-                logging.info(f"Found {len(location_data)} restaurants at coordinates ({coords['latitude']}, {coords['longitude']})")
-                
-                # Respect rate limits with 3 second delay
-                time.sleep(1)
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(all_data)
+            # Drop duplicate restaurants by ID before building any rows
+            all_data, cluster_ids = self._flatten_results(results, 'restaurantId')
             
-            # Drop duplicate rows based on restaurant ID
-            df = df.drop_duplicates(subset=['restaurantId'], keep='first')
+            # Convert to DataFrame with known columns (no key inference over every
+            # record) and per-column dtypes; cluster IDs are attached as one column
+            df = pd.DataFrame.from_records(all_data, columns=LISTING_COLUMNS).astype(LISTING_DTYPES)
+            df['cluster_id'] = cluster_ids
             
             logging.info(f"Loaded {len(df)} unique restaurants from Opentable")
             
@@ -97,7 +122,78 @@ class OpentableScraper(BaseLoader):
             logging.error(f"Error loading Opentable data: {str(e)}")
             raise
     
-
+    async def _load_data_async(self) -> List[List[Dict]]:
+        """
+        Scrape restaurant data for every cluster centroid concurrently.
+        
+        Returns:
+            List[List[Dict]]: Restaurant data per cluster
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        async with create_session(self.headers, self.max_concurrent_requests) as session:
+            return await asyncio.gather(*(
+                self._load_cluster_data(session, semaphore, cluster_id, coords)
+                for cluster_id, coords in self.centroids.items()
+            ))
+    
+    async def _load_cluster_data(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                 cluster_id: str, coords: Dict[str, float]) -> List[Dict]:
+        """
+        Scrape restaurant data for a single cluster centroid.
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            semaphore (asyncio.Semaphore): Bounds the number of in-flight requests
+            cluster_id (str): Cluster identifier
+            coords (Dict[str, float]): Centroid coordinates
+            
+        Returns:
+            List[Dict]: List of restaurant data for the cluster
+        """
+        # Reuse today's results for this cluster without re-scraping
+        cached = self._read_cache(cluster_id, coords)
+        if cached is not None:
+            logging.info(f"Using cached Opentable data for cluster {cluster_id}")
+            return cached
+        
+        logging.info(f"Loading Opentable data for cluster {cluster_id} at coordinates: ({coords['latitude']}, {coords['longitude']})")
+        
+        # Scrape all result pages for this location concurrently
+        pages = await asyncio.gather(*(
+            self._load_page(session, semaphore, coords, page)
+            for page in range(1, self.max_pages + 1)
+        ))
+        location_data = [item for page_data in pages if page_data is not None for item in page_data]
+        complete = all(page_data is not None for page_data in pages)
+        
+        # Log count of items for this location
+        logging.info(f"Found {len(location_data)} restaurants at coordinates ({coords['latitude']}, {coords['longitude']})")
+        
+        # Only cache complete results, so a failed page is scraped again on
+        # the next run instead of serving a truncated cluster all day
+        if location_data and complete:
+            self._write_cache(cluster_id, coords, location_data)
+            
+        return location_data
+    
+    async def _load_page(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                         coords: Dict[str, float], page: int) -> Optional[List[Dict]]:
+        """
+        Scrape one results page for a centroid within the shared rate limit.
+        
+        Args:
+            session (aiohttp.ClientSession): Shared HTTP session
+            semaphore (asyncio.Semaphore): Bounds the number of in-flight requests
+            coords (Dict[str, float]): Centroid coordinates
+            page (int): Page number to scrape
+            
+        Returns:
+            Optional[List[Dict]]: List of restaurant data, or None if the request failed
+        """
+        async with semaphore:
+            page_data = await self._scrape_location(session, coords['latitude'], coords['longitude'], page)
+            
+        return page_data
     
     def validate_data(self, data: pd.DataFrame) -> bool:
         """
@@ -112,17 +208,18 @@ class OpentableScraper(BaseLoader):
         required_columns = ['name', 'rating', 'review_count', 'address', 'categories', 'cluster_id']
         return all(col in data.columns for col in required_columns)
     
-    def _scrape_location(self, latitude: float, longitude: float, page: int=1) -> List[Dict]:
+    async def _scrape_location(self, session: aiohttp.ClientSession, latitude: float, longitude: float, page: int=1) -> Optional[List[Dict]]:
         """
         Scrape a single page of results for a location.
         
         Args:
+            session (aiohttp.ClientSession): Shared HTTP session
             latitude (float): Latitude coordinate
             longitude (float): Longitude coordinate
             page (int): Page number to scrape
             
         Returns:
-            List[Dict]: List of business data
+            Optional[List[Dict]]: List of business data, or None if the request failed
         """
         # Calculate next Saturday
         today = datetime.now()
@@ -134,24 +231,46 @@ class OpentableScraper(BaseLoader):
         # Format date and time for URL (YYYYMMDDTHHMM)
         datetime_string = f"{next_saturday.strftime('%Y%m%d')}T2100"
         
-        url = f"https://www.opentable.com/s?currentview=list&latitude={latitude}&longitude={longitude}&dateTime={datetime_string}&sortBy=distance"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
-        }
+        url = f"{self.base_url}/s?currentview=list&latitude={latitude}&longitude={longitude}&dateTime={datetime_string}&sortBy=distance"
+        if page > 1:
+            url += f"&page={page}"
         logging.info(f"Scraping URL: {url}")
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.content, "html.parser")
-
+        try:
+            status, content = await fetch_with_retries(
+                session, url,
+                max_retries=self.max_retries, backoff_factor=self.retry_backoff_factor,
+                rate_limiter=self.rate_limiter
+            )
+        except Exception as e:
+            logging.error(f"Error scraping location ({latitude}, {longitude}): {str(e)}")
+            return None
+        
+        if status != 200:
+            logging.error(f"Opentable request failed with status {status} for ({latitude}, {longitude})")
+            return None
+        
+        return self._parse_search_page(content)
+    
+    def _parse_search_page(self, content: bytes) -> List[Dict]:
+        """
+        Extract restaurant listings from the JSON script tags of a search page.
+        
+        Args:
+            content (bytes): Raw HTML of the search results page
+            
+        Returns:
+            List[Dict]: List of business data
+        """
         all_restaurants_data = []
 
-        script_tags = soup.find_all("script", attrs={"type": "application/json"})
-        for tag in script_tags:
+        # Only the script carrying the page state holds the listings; skip
+        # the other JSON blobs without parsing them
+        for match in _JSON_SCRIPT_RE.finditer(content):
+            json_bytes = match.group(1)
+            if b'__INITIAL_STATE__' not in json_bytes:
+                continue
             try:
-                json_text = tag.string or tag.get_text()
-                #json_text = tag.stringJ
-                data = json.loads(json_text)
-                
-                restaurants = data['windowVariables']['__INITIAL_STATE__']['multiSearch']['restaurants']
+                restaurants = self._extract_restaurants(json_bytes)
                 if isinstance(restaurants, list) and len(restaurants) > 0:
                     cleaned_restaurants = self._parse_business_listing(restaurants)
                     if cleaned_restaurants:
@@ -162,6 +281,25 @@ class OpentableScraper(BaseLoader):
     
         return all_restaurants_data
     
+    def _extract_restaurants(self, json_bytes: bytes) -> Optional[List[Dict]]:
+        """
+        Pull the restaurant list out of the page state without building the rest of it.
+        
+        The state blob is mostly unrelated UI data; simdjson indexes it in
+        place and only the restaurant list is turned into Python objects.
+        
+        Args:
+            json_bytes (bytes): Contents of the __INITIAL_STATE__ script tag
+            
+        Returns:
+            Optional[List[Dict]]: Restaurant list, or None if the path does not hold a list
+        """
+        # The parsed document must not outlive this call: the parser is
+        # reused for the next page
+        doc = self._json_parser.parse(json_bytes)
+        restaurants = doc.at_pointer('/windowVariables/__INITIAL_STATE__/multiSearch/restaurants')
+        return restaurants.as_list() if isinstance(restaurants, simdjson.Array) else None
+    
     def _parse_business_listing(self, listing: List[Dict]) -> List[Dict]:
         """
         Parse a list of business listings from the search results.
@@ -175,44 +313,51 @@ class OpentableScraper(BaseLoader):
         clean_data = []
         try:
             for item in listing:
-                try:
-                    features_dict = item.get("features", {})
-                    features_list = [key for key, val in features_dict.items() if isinstance(val, bool) and val]
-
-                    restaurant = {
-                        "restaurantId": item.get("restaurantId"),
-                        "name": item.get("name"),
-                        "type": item.get("type"),
-                        "profileLink": item.get("urls", {}).get("profileLink", {}).get("link"),
-                        "priceBand": item.get("priceBand", {}).get("name"),
-                        "currencySymbol": item.get("priceBand", {}).get("currencySymbol"),
-                        "neighborhood": item.get("neighborhood", {}).get("name"),
-                        "recentReservations": item.get("statistics", {}).get("recentReservationCount"),
-                        "reviewCount": item.get("statistics", {}).get("reviews", {}).get("allTimeTextReviewCount"),
-                        "rating": item.get("statistics", {}).get("reviews", {}).get("ratings", {}).get("overall", {}).get("rating"),
-                        "primaryCuisine": item.get("primaryCuisine", {}).get("name"),
-                        "isPromoted": item.get("isPromoted"),
-                        "features": features_list,
-                        "diningStyle": item.get("diningStyle"),
-                        "latitude": item.get("coordinates", {}).get("latitude"),
-                        "longitude": item.get("coordinates", {}).get("longitude"),
-                        "address_line1": item.get("address", {}).get("line1"),
-                        "address_line2": item.get("address", {}).get("line2"),
-                        "city": item.get("address", {}).get("city"),
-                        "state": item.get("address", {}).get("state"),
-                        "postcode": item.get("address", {}).get("postCode"),
-                        "description": item.get("description"),
-                        "topReview": item.get("topReview", {}).get("highlightedText"),
-                        "hasTakeout": item.get("hasTakeout"),
-                        "phone": item.get("contactInformation", {}).get("formattedPhoneNumber")
-                    }
+                if not isinstance(item, dict):
+                    continue
+                
+                # Look up each nested section once; sections that are missing,
+                # null or not objects read as empty, so one malformed section
+                # can't fail the whole page
+                features_dict = _section(item, "features")
+                features_list = [key for key, val in features_dict.items() if isinstance(val, bool) and val]
+                price_band = _section(item, "priceBand")
+                statistics = _section(item, "statistics")
+                reviews = _section(statistics, "reviews")
+                ratings = _section(reviews, "ratings")
+                coordinates = _section(item, "coordinates")
+                address = _section(item, "address")
+                profile_link = _section(_section(item, "urls"), "profileLink")
 
-                    clean_data.append(restaurant)
+                restaurant = {
+                    "restaurantId": item.get("restaurantId"),
+                    "name": item.get("name"),
+                    "type": item.get("type"),
+                    "profileLink": profile_link.get("link"),
+                    "priceBand": price_band.get("name"),
+                    "currencySymbol": price_band.get("currencySymbol"),
+                    "neighborhood": _section(item, "neighborhood").get("name"),
+                    "recentReservations": statistics.get("recentReservationCount"),
+                    "reviewCount": reviews.get("allTimeTextReviewCount"),
+                    "rating": _section(ratings, "overall").get("rating"),
+                    "primaryCuisine": _section(item, "primaryCuisine").get("name"),
+                    "isPromoted": item.get("isPromoted"),
+                    "features": features_list,
+                    "diningStyle": item.get("diningStyle"),
+                    "latitude": coordinates.get("latitude"),
+                    "longitude": coordinates.get("longitude"),
+                    "address_line1": address.get("line1"),
+                    "address_line2": address.get("line2"),
+                    "city": address.get("city"),
+                    "state": address.get("state"),
+                    "postcode": address.get("postCode"),
+                    "description": item.get("description"),
+                    "topReview": _section(item, "topReview").get("highlightedText"),
+                    "hasTakeout": item.get("hasTakeout"),
+                    "phone": _section(item, "contactInformation").get("formattedPhoneNumber")
+                }
 
-                
-                except Exception as e:
-                    logging.warning(f"Error parsing restaurant item: {str(e)}")
-                    continue
+                clean_data.append(restaurant)
                 
             return clean_data
         except Exception as e:
@@ -1,13 +1,18 @@
 import logging
+import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from loaders.base_loader import BaseLoader
 from loaders.api_loader import YelpDeliveryLoader
 from loaders.csv_loader import CSVLoader
 from loaders.web_scraper import OpentableScraper
 from helper.data_processor import process_restaurant_data
-from helper.scoring_engine import analyze_clusters
+from helper.scoring_engine import analyze_clusters, REQUIRED_COLUMNS, REQUIRED_COLUMN_TYPES
 from cleaning.data_cleaner import DataCleaner
 from config import settings
 
@@ -18,44 +23,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Sources loaded by load_data_sources, keyed by the name used for their snapshots
+DATA_SOURCE_LOADERS = {
+    'Yelp': YelpDeliveryLoader,
+    'CSV': CSVLoader,
+    'OpenTable': OpentableScraper
+}
+
+def _load_source(source_name: str, loader: BaseLoader) -> Optional[pd.DataFrame]:
+    """
+    Load one data source, logging rather than raising on failure.
+    
+    Args:
+        source_name (str): Name of the source, used in log messages
+        loader (BaseLoader): Loader for the source
+        
+    Returns:
+        Optional[pd.DataFrame]: Loaded data, or None if loading failed or returned nothing
+    """
+    try:
+        data = loader.load_data()
+        if not data.empty:
+            logger.info(f"Loaded {len(data)} records from {source_name}")
+            return data
+    except Exception as e:
+        logger.error(f"Error loading {source_name} data: {str(e)}")
+    return None
+
 def load_data_sources() -> Dict[str, pd.DataFrame]:
     """
-    Load data from all available sources.
+    Load data from all available sources concurrently.
+    
+    The sources are independent and I/O-bound, so total load time is that
+    of the slowest source rather than the sum of all of them.
     
     Returns:
         Dict[str, pd.DataFrame]: Dictionary of dataframes from each source
     """
     raw_data = {}
     
-    # Load Yelp data
-    try:
-        yelp_loader = YelpDeliveryLoader()
-        yelp_data = yelp_loader.load_data()
-        if not yelp_data.empty:
-            raw_data['Yelp'] = yelp_data
-            logger.info(f"Loaded {len(yelp_data)} records from Yelp")
-    except Exception as e:
-        logger.error(f"Error loading Yelp data: {str(e)}")
-
-    # Load CSV data
-    try:
-        csv_loader = CSVLoader()
-        csv_data = csv_loader.load_data()
-        if not csv_data.empty:
-            raw_data['CSV'] = csv_data
-            logger.info(f"Loaded {len(csv_data)} records from CSV")
-    except Exception as e:
-        logger.error(f"Error loading CSV data: {str(e)}")
-
-    # Load OpenTable data
-    try:
-        opentable_scraper = OpentableScraper()
-        opentable_data = opentable_scraper.load_data()
-        if not opentable_data.empty:
-            raw_data['OpenTable'] = opentable_data
-            logger.info(f"Loaded {len(opentable_data)} records from OpenTable")
-    except Exception as e:
-        logger.error(f"Error loading OpenTable data: {str(e)}")
+    # Create every loader up front so the API loaders all read the same
+    # cluster centroids before CSVLoader regenerates them
+    loaders = {}
+    for source_name, loader_class in DATA_SOURCE_LOADERS.items():
+        try:
+            loaders[source_name] = loader_class()
+        except Exception as e:
+            logger.error(f"Error loading {source_name} data: {str(e)}")
+    
+    if not loaders:
+        return raw_data
+    
+    with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+        futures = {
+            executor.submit(_load_source, source_name, loader): source_name
+            for source_name, loader in loaders.items()
+        }
+        for future in as_completed(futures):
+            data = future.result()
+            if data is not None:
+                raw_data[futures[future]] = data
 
     return raw_data
 
@@ -65,7 +92,7 @@ def save_processed_data(df: pd.DataFrame, output_format: str = 'csv', output_fil
     
     Args:
         df (pd.DataFrame): Data to save
-        output_format (str): Format to save data in ('csv' or 'json')
+        output_format (str): Format to save data in ('csv', 'json' or 'parquet')
         output_file_name (str): Name of the output file
     """
     try:
@@ -76,9 +103,17 @@ def save_processed_data(df: pd.DataFrame, output_format: str = 'csv', output_fil
         output_file = output_dir / f"{output_file_name}_{timestamp}.{output_format}"
         
         if output_format == 'csv':
-            df.to_csv(output_file, index=False)
+            # Multithreaded Arrow writer; nested columns (e.g. category lists)
+            # are written in their Python repr, as to_csv did
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            for i, field in enumerate(table.schema):
+                if pa.types.is_nested(field.type):
+                    table = table.set_column(i, field.name, pa.array(df[field.name].astype(str), pa.string()))
+            pacsv.write_csv(table, output_file)
         elif output_format == 'json':
             df.to_json(output_file, orient='records', lines=True)
+        elif output_format == 'parquet':
+            df.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
             
         logger.info(f"Saved {len(df)} records to {output_file}")
         
@@ -97,23 +132,31 @@ def process_data():
             logger.error("No data loaded from any source")
             return
             
-        # Save data from each source
-        for source_name, df in raw_data.items():
-            save_processed_data(
-                df,
-                output_format='csv',
-                output_file_name=f"{source_name.lower()}_data"
-            )
+        # Snapshot each source in the background (the writers release the GIL)
+        # while processing works on the in-memory frames
+        with ThreadPoolExecutor(max_workers=len(raw_data)) as executor:
+            futures = [
+                executor.submit(
+                    save_processed_data,
+                    df,
+                    output_format=settings.PROCESSING['output_format'],
+                    output_file_name=f"{source_name.lower()}_data"
+                )
+                for source_name, df in raw_data.items()
+            ]
             
-        # Process and combine the data
-        logger.info("Processing and combining restaurant data...")
-        try:
-            combined_data = process_restaurant_data()
-            logger.info(f"Successfully combined {len(combined_data)} restaurant records")
+            # Process and combine the data
+            logger.info("Processing and combining restaurant data...")
+            try:
+                combined_data = process_restaurant_data(raw_data)
+                logger.info(f"Successfully combined {len(combined_data)} restaurant records")
+                
+            except Exception as e:
+                logger.error(f"Error processing restaurant data: {str(e)}")
+                raise
             
-        except Exception as e:
-            logger.error(f"Error processing restaurant data: {str(e)}")
-            raise
+            for future in futures:
+                future.result()
             
         logger.info("Data processing completed successfully")
         
@@ -129,19 +172,31 @@ def analyze_data(category: str = None):
         category (str, optional): Restaurant category to analyze. If None, analyzes all restaurants.
     """
     try:
-        # Find the most recent combined data file
+        # Find the most recent combined data file. Names end in a
+        # %Y%m%d_%H%M%S timestamp, so the newest file is the largest name and
+        # no file needs to be stat'ed
         processed_dir = Path(settings.DATA_DIR) / 'processed'
-        combined_files = list(processed_dir.glob('combined_restaurants_*.csv'))
+        with os.scandir(processed_dir) as entries:
+            combined_files = [
+                entry.name for entry in entries
+                if entry.name.startswith('combined_restaurants_') and entry.name.endswith('.csv')
+            ]
         
         if not combined_files:
             raise FileNotFoundError("No processed data files found")
             
         # Get the most recent file
-        latest_file = max(combined_files, key=lambda x: x.stat().st_mtime)
+        latest_file = processed_dir / max(combined_files)
         logger.info(f"Reading processed data from {latest_file}")
         
-        # Read the combined data
-        combined_data = pd.read_csv(latest_file)
+        # Read only the columns the cluster analysis uses
+        combined_data = pacsv.read_csv(
+            latest_file,
+            convert_options=pacsv.ConvertOptions(
+                include_columns=REQUIRED_COLUMNS,
+                column_types=REQUIRED_COLUMN_TYPES
+            )
+        ).to_pandas(types_mapper=pd.ArrowDtype)
         
         # Create final_output directory
         final_output_dir = Path(settings.DATA_DIR) / 'final_output'
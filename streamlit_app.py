@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
-import folium
-from folium.plugins import HeatMap
-from streamlit_folium import st_folium
+import ast
+import itertools
+import pydeck as pdk
 import os
 import glob
-import subprocess
+import asyncio
+from collections import Counter, deque
 from pathlib import Path
 import plotly.express as px
 
@@ -17,8 +19,10 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS for better aesthetics
-st.markdown("""
+# Custom CSS for better aesthetics, including the top locations table,
+# injected in a single call. Streamlit drops elements a rerun doesn't render,
+# so this still runs on every rerun
+APP_CSS = """
     <style>
     .main {
         padding: 2rem;
@@ -97,13 +101,204 @@ st.markdown("""
         border-left: 4px solid #C62828;
         font-weight: 500;
     }
+    .dataframe {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 0;
+        font-size: 0.9em;
+        font-family: sans-serif;
+        box-shadow: 0 0 20px rgba(0, 0, 0, 0.15);
+    }
+    .dataframe thead tr {
+        background-color: #4CAF50;
+        color: #ffffff;
+        text-align: left;
+    }
+    .dataframe th,
+    .dataframe td {
+        padding: 6px 10px;
+    }
+    .dataframe tbody tr {
+        border-bottom: 1px solid #dddddd;
+    }
+    .dataframe tbody tr:nth-of-type(even) {
+        background-color: #f3f3f3;
+    }
+    .dataframe tbody tr:last-of-type {
+        border-bottom: 2px solid #4CAF50;
+    }
     </style>
-    """, unsafe_allow_html=True)
+    """
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# Directory listing, cached; dir_mtime_ns is part of the cache key, so the
+# glob only runs again once files are added to or removed from the directory
+@st.cache_data
+def list_files(base_path, pattern, dir_mtime_ns):
+    return glob.glob(os.path.join(base_path, pattern))
 
 # Automatically detect latest 4 files based on timestamp in name
 def get_latest_files(base_path='data/final_output/', pattern='cluster_analysis_*.csv'):
-    files = glob.glob(os.path.join(base_path, pattern))
-    return files
+    try:
+        dir_mtime_ns = os.stat(base_path).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    return list_files(base_path, pattern, dir_mtime_ns)
+
+# Strategy file columns the app uses, with their dtypes. Scores stay float64
+# so rounded values display exactly
+STRATEGY_COLUMNS = {'cluster_id': 'int32', 'score': 'float64'}
+
+# Cached file loaders: Streamlit reruns the whole script on every interaction,
+# so parse each file once. The mtime argument is part of the cache key, so a
+# rewritten file is read again
+@st.cache_data
+def load_centroids(path, mtime):
+    # main.py writes a Parquet copy next to the JSON; use it unless it is
+    # older than the JSON
+    parquet_path = Path(path).with_suffix('.parquet')
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= mtime:
+        return pd.read_parquet(parquet_path).astype({'cluster_id': STRATEGY_COLUMNS['cluster_id']})
+    
+    with open(path, 'r') as f:
+        centroids = json.load(f)
+    centroid_df = pd.DataFrame([
+        {
+            'cluster_id': int(cid),
+            'lat': coords['latitude'],
+            'long': coords['longitude']
+        } for cid, coords in centroids.items()
+    ]).astype({'cluster_id': STRATEGY_COLUMNS['cluster_id']})
+    
+    # Write the Parquet copy for next time
+    try:
+        centroid_df.to_parquet(parquet_path, index=False)
+    except OSError:
+        pass
+    return centroid_df
+
+# Strategy results joined with the cluster centroids, plus the number of
+# locations per cluster; recomputed only when either file changes
+@st.cache_data
+def load_merged(strategy_path, strategy_mtime, centroids_path, centroids_mtime):
+    # Only the cluster and its score are used from the strategy file
+    df = pd.read_csv(strategy_path, usecols=list(STRATEGY_COLUMNS), dtype=STRATEGY_COLUMNS)
+    centroid_df = load_centroids(centroids_path, centroids_mtime)
+    merged_df = pd.merge(df, centroid_df, on='cluster_id', how='left')
+    return merged_df, merged_df['cluster_id'].value_counts()
+
+# Rows per chunk when counting categories in the combined data
+CATEGORY_CHUNK_SIZE = 200_000
+
+# Count the most common categories in the combined data, streaming the
+# categories column in chunks so memory stays at one chunk whatever the
+# file size
+@st.cache_data
+def count_categories(path, mtime, top_n=10):
+    counter = Counter()
+    for chunk in pd.read_csv(path, usecols=['categories'], chunksize=CATEGORY_CHUNK_SIZE):
+        # Parse each string representation of a list safely
+        category_lists = chunk['categories'].dropna().map(ast.literal_eval)
+        counter.update(itertools.chain.from_iterable(category_lists))
+    return pd.Series(dict(counter.most_common(top_n)), dtype='int64')
+
+# Number of trailing output lines kept from main.py (shown live and on errors)
+OUTPUT_TAIL_LINES = 20
+
+# Run a command, streaming its output into a placeholder as it arrives; only
+# the last OUTPUT_TAIL_LINES lines are kept in memory
+async def run_and_stream(cmd, placeholder):
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,  # main.py logs to stderr
+        limit=1 << 20  # Allow long log lines
+    )
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    async for line in proc.stdout:
+        tail.append(line.decode(errors='replace').rstrip())
+        placeholder.text("\n".join(tail))
+    returncode = await proc.wait()
+    return returncode, "\n".join(tail)
+
+# Heatmaps with more points than this are binned onto a grid of
+# HEATMAP_GRID_DEGREES (~100 m) cells before being sent to the browser
+HEATMAP_MAX_POINTS = 10_000
+HEATMAP_GRID_DEGREES = 0.001
+
+# Marker fill colors (RGB) for the top clusters, by rank
+MARKER_COLORS = [
+    [255, 0, 0],  # red
+    [255, 165, 0],  # orange
+    [0, 128, 0],  # green
+    [0, 0, 255],  # blue
+    [128, 0, 128],  # purple
+    [139, 0, 0]  # darkred
+]
+
+# Build the map once per analysis result; unrelated widget changes rerun the
+# script but reuse the cached map. Only merged_hash is hashed for the cache
+# key (top clusters are derived from the merged frame). The cache is shared by
+# all sessions, so keep only the most recent maps
+@st.cache_resource(max_entries=8)
+def build_map(merged_hash, _merged_df, _top_clusters):
+    # Heatmap based on score; density is computed on the GPU (WebGL), so
+    # panning and zooming don't recompute it in JavaScript. Clusters without
+    # a centroid can't be placed. Rounding (~1 m, and well below the score
+    # differences) shortens every number serialized to the browser
+    heat_data = _merged_df[['lat', 'long', 'score']].dropna(subset=['lat', 'long'])
+    if len(heat_data) > HEATMAP_MAX_POINTS:
+        # Snap large point sets onto a coarse grid and sum their scores; the
+        # heatmap kernel smears neighbouring points together anyway
+        heat_data = (
+            heat_data.assign(
+                lat=(heat_data['lat'] / HEATMAP_GRID_DEGREES).round() * HEATMAP_GRID_DEGREES,
+                long=(heat_data['long'] / HEATMAP_GRID_DEGREES).round() * HEATMAP_GRID_DEGREES
+            )
+            .groupby(['lat', 'long'], as_index=False)['score'].sum()
+        )
+    heat_data = heat_data.round({'lat': 5, 'long': 5, 'score': 3})
+    heatmap = pdk.Layer(
+        'HeatmapLayer',
+        data=heat_data,
+        get_position=['long', 'lat'],
+        get_weight='score',
+        radius_pixels=25
+    )
+
+    # Top clusters as numbered circles with different colors based on rank
+    top_data = _top_clusters[['lat', 'long', 'cluster_id', 'score']].copy()
+    top_data['rank'] = [str(rank) for rank in range(1, len(top_data) + 1)]
+    top_data['color'] = MARKER_COLORS[:len(top_data)]
+    top_data['score'] = top_data['score'].round(2)
+    markers = pdk.Layer(
+        'ScatterplotLayer',
+        data=top_data,
+        get_position=['long', 'lat'],
+        get_fill_color='color',
+        get_line_color=[255, 255, 255],
+        radius_units='pixels',
+        get_radius=15,
+        line_width_units='pixels',
+        get_line_width=2,
+        stroked=True,
+        pickable=True
+    )
+    labels = pdk.Layer(
+        'TextLayer',
+        data=top_data,
+        get_position=['long', 'lat'],
+        get_text='rank',
+        get_color=[255, 255, 255],
+        get_size=16,
+        font_weight='bold'
+    )
+
+    return pdk.Deck(
+        layers=[heatmap, markers, labels],
+        initial_view_state=pdk.ViewState(latitude=34.05, longitude=-118.25, zoom=10),
+        tooltip={'html': 'Rank: {rank}<br>Cluster ID: {cluster_id}<br>Score: {score}'}
+    )
 
 # Title and description
 st.title("🍽️ BizScout AI - Restaurant Analysis")
@@ -119,6 +314,8 @@ if 'merged_df' not in st.session_state:
     st.session_state.merged_df = None
 if 'top_clusters' not in st.session_state:
     st.session_state.top_clusters = None
+if 'cluster_counts' not in st.session_state:
+    st.session_state.cluster_counts = None
 
 # Input section with aesthetic design
 with st.container():
@@ -253,21 +450,13 @@ with st.container():
                 
             try:
                 with st.spinner("Running analysis... This may take a few minutes."):
-                    result = subprocess.run(cmd, capture_output=True, text=True)
-                    if result.returncode == 0:
+                    progress = st.empty()
+                    returncode, output = asyncio.run(run_and_stream(cmd, progress))
+                    progress.empty()
+                    if returncode == 0:
                         st.success("Analysis completed successfully!")
                         
-                        # Load centroids
-                        with open('data/semi_processed/cluster_centroids.json', 'r') as f:
-                            centroids = json.load(f)
-
-                        centroid_df = pd.DataFrame([
-                            {
-                                'cluster_id': int(cid),
-                                'lat': coords['latitude'],
-                                'long': coords['longitude']
-                            } for cid, coords in centroids.items()
-                        ])
+                        centroids_path = 'data/semi_processed/cluster_centroids.json'
 
                         # Find the matching strategy file
                         matching_file = None
@@ -284,14 +473,16 @@ with st.container():
                                 break
                         
                         if matching_file:
-                            # Read and prepare selected file
-                            df = pd.read_csv(matching_file)
-                            df['cluster_id'] = df['cluster_id'].astype(int)
-                            merged_df = pd.merge(df, centroid_df, on='cluster_id', how='left')
+                            # Read the selected file and join it with the centroids
+                            merged_df, cluster_counts = load_merged(
+                                matching_file, os.path.getmtime(matching_file),
+                                centroids_path, os.path.getmtime(centroids_path)
+                            )
                             
                             # Store results in session state
                             st.session_state.merged_df = merged_df
-                            st.session_state.top_clusters = merged_df.sort_values(by='score', ascending=False).head(6)
+                            st.session_state.cluster_counts = cluster_counts
+                            st.session_state.top_clusters = merged_df.nlargest(6, 'score')  # Partial sort for the top 6
                             st.session_state.analysis_completed = True
                         else:
                             st.error(f"""
@@ -303,341 +494,279 @@ with st.container():
                             """)
                         
                     else:
-                        st.error(f"Error running analysis: {result.stderr}")
+                        st.error(f"Error running analysis: {output}")
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Only show visualizations if analysis is completed
-if st.session_state.analysis_completed and st.session_state.merged_df is not None:
+# Bin scores server-side so only the bin centers and counts are sent to the
+# browser, rather than every score
+@st.cache_data
+def score_histogram(scores, bins=30):
+    counts, edges = np.histogram(scores[~np.isnan(scores)], bins=bins)
+    return pd.DataFrame({'score': (edges[:-1] + edges[1:]) / 2, 'count': counts})
+
+# Result sections run as fragments, so an interaction inside one section
+# reruns only that section
+@st.fragment
+def render_map_section():
     # Create a full-width map
     st.subheader("🗺️ Location Analysis Map")
-    m = folium.Map(location=[34.05, -118.25], zoom_start=10, control_scale=True)
+    merged_hash = int(pd.util.hash_pandas_object(st.session_state.merged_df).sum())
+    deck = build_map(merged_hash, st.session_state.merged_df, st.session_state.top_clusters)
 
-    # Heatmap based on score
-    heat_data = [
-        [row['lat'], row['long'], row['score']] for _, row in st.session_state.merged_df.iterrows()
-    ]
-    HeatMap(heat_data, radius=15, blur=10, max_zoom=12).add_to(m)
-
-    # Top clusters with different colors based on rank
-    colors = ['red', 'orange', 'green', 'blue', 'purple', 'darkred']
-    for idx, (_, row) in enumerate(st.session_state.top_clusters.iterrows()):
-        # Create custom HTML for numbered marker
-        rank = idx + 1
-        html = f"""
-            <div style="
-                background-color: {colors[idx]};
-                color: white;
-                width: 30px;
-                height: 30px;
-                border-radius: 50%;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                font-weight: bold;
-                font-size: 16px;
-                border: 2px solid white;
-                box-shadow: 0 0 5px rgba(0,0,0,0.3);
-            ">
-                {rank}
-            </div>
-        """
-        
-        # Create custom icon
-        icon = folium.DivIcon(
-            html=html,
-            class_name='custom-marker'
+    # Render map with full width
+    st.pydeck_chart(deck, use_container_width=True, height=380)
+
+@st.fragment
+def render_top_locations():
+    # Create a styled table for top locations
+    top_locations = st.session_state.top_clusters[['cluster_id', 'score', 'lat', 'long']].copy()
+    top_locations['Rank'] = range(1, len(top_locations) + 1)
+    top_locations['Score'] = top_locations['score'].round(2)
+    top_locations['Latitude'] = top_locations['lat'].round(6)
+    top_locations['Longitude'] = top_locations['long'].round(6)
+
+    # Count locations in each cluster from the full dataset (computed
+    # once when the results were loaded)
+    top_locations['Location Count'] = top_locations['cluster_id'].map(st.session_state.cluster_counts)
+
+    # Reorder columns and drop unnecessary ones
+    top_locations = top_locations[['Rank', 'cluster_id', 'Score', 'Location Count', 'Latitude', 'Longitude']]
+
+    # Display the table (styled by APP_CSS)
+    st.dataframe(top_locations, use_container_width=True)
+
+    # Add statistics in columns with minimal spacing
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Average Score", f"{top_locations['Score'].mean():.2f}")
+    with col2:
+        st.metric("Highest Score", f"{top_locations['Score'].max():.2f}")
+    with col3:
+        st.metric("Total Locations", f"{top_locations['Location Count'].sum():,}")
+    with col4:
+        st.metric("Avg. Locations/Cluster", f"{top_locations['Location Count'].mean():.1f}")
+
+    # Add a bar chart showing location distribution
+    fig_locations = px.bar(
+        top_locations,
+        x='Rank',
+        y='Location Count',
+        title='Location Distribution in Top Clusters',
+        color='Score',
+        color_continuous_scale='Plasma',
+        labels={'Location Count': 'Number of Locations', 'Rank': 'Cluster Rank'}
+    )
+    fig_locations.update_layout(
+        plot_bgcolor='white',
+        title_x=0.5,
+        margin=dict(t=15, b=5, l=5, r=5),
+        height=300,
+        xaxis=dict(
+            showgrid=True,
+            gridcolor='#E0E0E0',
+            title_font=dict(size=12, color='#424242')
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor='#E0E0E0',
+            title_font=dict(size=12, color='#424242')
+        ),
+        title_font=dict(size=14, color='#212121'),
+        coloraxis_colorbar=dict(
+            title="Score",
+            thickness=15,
+            len=0.5,
+            yanchor="middle",
+            y=0.5,
+            xanchor="right",
+            x=1.1
         )
-        
-        folium.Marker(
-            location=[row['lat'], row['long']],
-            popup=f"Rank: {rank}<br>Cluster ID: {row['cluster_id']}<br>Score: {row['score']:.2f}",
-            icon=icon
-        ).add_to(m)
-
-    # Add custom CSS for markers
-    st.markdown("""
-        <style>
-        .custom-marker {
-            background: none;
-            border: none;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    )
+    st.plotly_chart(fig_locations, use_container_width=True)
 
-    # Render map with full width
-    st_folium(m, width=None, height=380)  # Further reduced height
+@st.fragment
+def render_score_distribution():
+    # Score distribution plot
+    st.subheader("Score Distribution Analysis")
 
-    # Create tabs for different visualizations with minimal spacing
-    tab1, tab2, tab3 = st.tabs(["📊 Top Locations", "📈 Score Distribution", "🎯 Category Analysis"])
+    # Create histogram of scores from precomputed bins
+    score_bins = score_histogram(st.session_state.merged_df['score'].to_numpy())
+    fig = px.bar(
+        score_bins,
+        x='score',
+        y='count',
+        title='Distribution of Location Scores',
+        labels={'score': 'Score', 'count': 'Number of Locations'},
+        color_discrete_sequence=['#2196F3'],  # Blue color
+        opacity=0.8
+    )
 
-    with tab1:
-        # Create a styled table for top locations
-        top_locations = st.session_state.top_clusters[['cluster_id', 'score', 'lat', 'long']].copy()
-        top_locations['Rank'] = range(1, len(top_locations) + 1)
-        top_locations['Score'] = top_locations['score'].round(2)
-        top_locations['Latitude'] = top_locations['lat'].round(6)
-        top_locations['Longitude'] = top_locations['long'].round(6)
-        
-        # Count locations in each cluster from the full dataset
-        cluster_counts = st.session_state.merged_df['cluster_id'].value_counts()
-        top_locations['Location Count'] = top_locations['cluster_id'].map(cluster_counts)
-        
-        # Reorder columns and drop unnecessary ones
-        top_locations = top_locations[['Rank', 'cluster_id', 'Score', 'Location Count', 'Latitude', 'Longitude']]
-        
-        # Display the table with custom styling
-        st.markdown("""
-            <style>
-            .dataframe {
-                width: 100%;
-                border-collapse: collapse;
-                margin: 0;
-                font-size: 0.9em;
-                font-family: sans-serif;
-                box-shadow: 0 0 20px rgba(0, 0, 0, 0.15);
-            }
-            .dataframe thead tr {
-                background-color: #4CAF50;
-                color: #ffffff;
-                text-align: left;
-            }
-            .dataframe th,
-            .dataframe td {
-                padding: 6px 10px;
-            }
-            .dataframe tbody tr {
-                border-bottom: 1px solid #dddddd;
-            }
-            .dataframe tbody tr:nth-of-type(even) {
-                background-color: #f3f3f3;
-            }
-            .dataframe tbody tr:last-of-type {
-                border-bottom: 2px solid #4CAF50;
-            }
-            </style>
-        """, unsafe_allow_html=True)
-        
-        st.dataframe(top_locations, use_container_width=True)
-        
-        # Add statistics in columns with minimal spacing
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Average Score", f"{top_locations['Score'].mean():.2f}")
-        with col2:
-            st.metric("Highest Score", f"{top_locations['Score'].max():.2f}")
-        with col3:
-            st.metric("Total Locations", f"{top_locations['Location Count'].sum():,}")
-        with col4:
-            st.metric("Avg. Locations/Cluster", f"{top_locations['Location Count'].mean():.1f}")
-        
-        # Add a bar chart showing location distribution
-        fig_locations = px.bar(
-            top_locations,
-            x='Rank',
-            y='Location Count',
-            title='Location Distribution in Top Clusters',
-            color='Score',
-            color_continuous_scale='Plasma',
-            labels={'Location Count': 'Number of Locations', 'Rank': 'Cluster Rank'}
+    fig.update_layout(
+        bargap=0,  # Adjacent bins, as in a histogram
+        showlegend=True,
+        plot_bgcolor='white',
+        title_x=0.5,
+        margin=dict(t=15, b=5, l=5, r=5),
+        height=320,
+        xaxis=dict(
+            showgrid=True,
+            gridcolor='#E0E0E0',
+            title_font=dict(size=12, color='#424242')
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor='#E0E0E0',
+            title_font=dict(size=12, color='#424242')
+        ),
+        title_font=dict(size=14, color='#212121'),
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01,
+            bgcolor='rgba(255, 255, 255, 0.8)'
         )
-        fig_locations.update_layout(
-            plot_bgcolor='white',
-            title_x=0.5,
-            margin=dict(t=15, b=5, l=5, r=5),
-            height=300,
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='#E0E0E0',
-                title_font=dict(size=12, color='#424242')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='#E0E0E0',
-                title_font=dict(size=12, color='#424242')
-            ),
-            title_font=dict(size=14, color='#212121'),
-            coloraxis_colorbar=dict(
-                title="Score",
-                thickness=15,
-                len=0.5,
-                yanchor="middle",
-                y=0.5,
-                xanchor="right",
-                x=1.1
-            )
+    )
+
+    fig.update_traces(
+        marker=dict(
+            line=dict(width=1, color='#FFFFFF')
         )
-        st.plotly_chart(fig_locations, use_container_width=True)
+    )
+    st.plotly_chart(fig, use_container_width=True)
 
-    with tab2:
-        # Score distribution plot
-        st.subheader("Score Distribution Analysis")
-        
-        # Create histogram of scores
-        fig = px.histogram(
-            st.session_state.merged_df,
-            x='score',
-            nbins=30,
-            title='Distribution of Location Scores',
-            labels={'score': 'Score', 'count': 'Number of Locations'},
-            color_discrete_sequence=['#2196F3'],  # Blue color
-            opacity=0.8
+    # Box plot of scores with enhanced styling
+    fig2 = px.box(
+        st.session_state.merged_df,
+        y='score',
+        title='Score Distribution Box Plot',
+        labels={'score': 'Score'},
+        color_discrete_sequence=['#2196F3'],  # Changed to blue to match button
+        points='outliers'  # Show only outlier points
+    )
+    fig2.update_layout(
+        showlegend=True,
+        plot_bgcolor='white',
+        title_x=0.5,
+        margin=dict(t=15, b=5, l=5, r=5),
+        height=280,
+        xaxis=dict(
+            showgrid=True,
+            gridcolor='#E0E0E0',
+            title_font=dict(size=12, color='#424242')
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor='#E0E0E0',
+            title_font=dict(size=12, color='#424242')
+        ),
+        title_font=dict(size=14, color='#212121'),
+        legend=dict(
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01,
+            bgcolor='rgba(255, 255, 255, 0.8)'
         )
-        
-        fig.update_layout(
-            showlegend=True,
-            plot_bgcolor='white',
-            title_x=0.5,
-            margin=dict(t=15, b=5, l=5, r=5),
-            height=320,
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='#E0E0E0',
-                title_font=dict(size=12, color='#424242')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='#E0E0E0',
-                title_font=dict(size=12, color='#424242')
-            ),
-            title_font=dict(size=14, color='#212121'),
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.01,
-                bgcolor='rgba(255, 255, 255, 0.8)'
+    )
+    fig2.update_traces(
+        boxmean=True,  # Show mean
+        marker=dict(
+            size=4,
+            color='#2196F3',  # Changed to blue
+            line=dict(width=1, color='#1976D2')  # Darker blue outline
+        ),
+        line=dict(
+            color='#1976D2',  # Darker blue
+            width=2
+        ),
+        fillcolor='#BBDEFB'  # Light blue fill
+    )
+    st.plotly_chart(fig2, use_container_width=True)
+
+@st.fragment
+def render_category_analysis():
+    st.subheader("Category-based Analysis")
+
+    # Load and process category data from combined restaurants
+    try:
+        # Get the latest combined restaurants file
+        combined_files = get_latest_files('data/processed/', 'combined_restaurants_*.csv')
+        if combined_files:
+            # Names end in a %Y%m%d_%H%M%S timestamp, so the newest file
+            # has the largest name; no need to stat every file
+            latest_file = max(combined_files, key=os.path.basename)
+
+            # Count categories
+            category_counts = count_categories(latest_file, os.path.getmtime(latest_file))
+
+            # Create color palette with blue tones
+            colors = px.colors.sequential.Blues[2:12]  # Blue color sequence
+
+            # Create pie chart with enhanced styling
+            fig_categories = px.pie(
+                values=category_counts.values,
+                names=category_counts.index,
+                title='Top 10 Restaurant Categories',
+                color_discrete_sequence=colors,
+                hole=0.4  # Create a donut chart
             )
-        )
-        
-        fig.update_traces(
-            marker=dict(
-                line=dict(width=1, color='#FFFFFF')
+
+            # Update layout
+            fig_categories.update_layout(
+                plot_bgcolor='white',
+                title_x=0.5,
+                margin=dict(t=15, b=5, l=5, r=5),
+                height=350,
+                title_font=dict(size=14, color='#212121'),
+                legend=dict(
+                    yanchor="top",
+                    y=0.99,
+                    xanchor="left",
+                    x=1.05,
+                    bgcolor='rgba(255, 255, 255, 0.8)'
+                )
             )
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Box plot of scores with enhanced styling
-        fig2 = px.box(
-            st.session_state.merged_df,
-            y='score',
-            title='Score Distribution Box Plot',
-            labels={'score': 'Score'},
-            color_discrete_sequence=['#2196F3'],  # Changed to blue to match button
-            points='all'  # Show all points
-        )
-        fig2.update_layout(
-            showlegend=True,
-            plot_bgcolor='white',
-            title_x=0.5,
-            margin=dict(t=15, b=5, l=5, r=5),
-            height=280,
-            xaxis=dict(
-                showgrid=True,
-                gridcolor='#E0E0E0',
-                title_font=dict(size=12, color='#424242')
-            ),
-            yaxis=dict(
-                showgrid=True,
-                gridcolor='#E0E0E0',
-                title_font=dict(size=12, color='#424242')
-            ),
-            title_font=dict(size=14, color='#212121'),
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.01,
-                bgcolor='rgba(255, 255, 255, 0.8)'
+
+            # Update traces for better appearance
+            fig_categories.update_traces(
+                textposition='inside',
+                textinfo='percent+label',
+                insidetextorientation='radial',
+                marker=dict(
+                    line=dict(width=1, color='#FFFFFF')
+                )
             )
-        )
-        fig2.update_traces(
-            boxmean=True,  # Show mean
-            marker=dict(
-                size=4,
-                color='#2196F3',  # Changed to blue
-                line=dict(width=1, color='#1976D2')  # Darker blue outline
-            ),
-            line=dict(
-                color='#1976D2',  # Darker blue
-                width=2
-            ),
-            fillcolor='#BBDEFB'  # Light blue fill
-        )
-        st.plotly_chart(fig2, use_container_width=True)
+
+            st.plotly_chart(fig_categories, use_container_width=True)
+
+            # Display category statistics with minimal spacing
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Total Categories", len(category_counts))
+            with col2:
+                st.metric("Most Common Category", f"{category_counts.index[0]} ({category_counts.iloc[0]})")
+
+        else:
+            st.info("No combined restaurant data found.")
+    except Exception as e:
+        st.error(f"Error loading category data: {str(e)}")
+
+# Only show visualizations if analysis is completed
+if st.session_state.analysis_completed and st.session_state.merged_df is not None:
+    render_map_section()
+
+    # Create tabs for different visualizations with minimal spacing
+    tab1, tab2, tab3 = st.tabs(["📊 Top Locations", "📈 Score Distribution", "🎯 Category Analysis"])
+
+    with tab1:
+        render_top_locations()
+
+    with tab2:
+        render_score_distribution()
 
     with tab3:
-        st.subheader("Category-based Analysis")
-        
-        # Load and process category data from combined restaurants
-        try:
-            # Get the latest combined restaurants file
-            combined_files = glob.glob('data/processed/combined_restaurants_*.csv')
-            if combined_files:
-                latest_file = max(combined_files, key=os.path.getctime)
-                df_combined = pd.read_csv(latest_file)
-                
-                # Process categories
-                all_categories = []
-                for cats in df_combined['categories']:
-                    if isinstance(cats, str):
-                        # Convert string representation of list to actual list
-                        cats = eval(cats)
-                        all_categories.extend(cats)
-                
-                # Count categories
-                category_counts = pd.Series(all_categories).value_counts().head(10)
-                
-                # Create color palette with blue tones
-                colors = px.colors.sequential.Blues[2:12]  # Blue color sequence
-                
-                # Create pie chart with enhanced styling
-                fig_categories = px.pie(
-                    values=category_counts.values,
-                    names=category_counts.index,
-                    title='Top 10 Restaurant Categories',
-                    color_discrete_sequence=colors,
-                    hole=0.4  # Create a donut chart
-                )
-                
-                # Update layout
-                fig_categories.update_layout(
-                    plot_bgcolor='white',
-                    title_x=0.5,
-                    margin=dict(t=15, b=5, l=5, r=5),
-                    height=350,
-                    title_font=dict(size=14, color='#212121'),
-                    legend=dict(
-                        yanchor="top",
-                        y=0.99,
-                        xanchor="left",
-                        x=1.05,
-                        bgcolor='rgba(255, 255, 255, 0.8)'
-                    )
-                )
-                
-                # Update traces for better appearance
-                fig_categories.update_traces(
-                    textposition='inside',
-                    textinfo='percent+label',
-                    insidetextorientation='radial',
-                    marker=dict(
-                        line=dict(width=1, color='#FFFFFF')
-                    )
-                )
-                
-                st.plotly_chart(fig_categories, use_container_width=True)
-                
-                # Display category statistics with minimal spacing
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Total Categories", len(category_counts))
-                with col2:
-                    st.metric("Most Common Category", f"{category_counts.index[0]} ({category_counts.iloc[0]})")
-                
-            else:
-                st.info("No combined restaurant data found.")
-        except Exception as e:
-            st.error(f"Error loading category data: {str(e)}")
+        render_category_analysis()